@@ -1,49 +1,105 @@
 # app.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+import os
 import urllib.parse
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import date
+from charts import ChartStore, date_key
+from confidence import interval_captions
+from cube import SummaryCube
+from datastore import cached_read, read_snapshot, source_signature
+from engine import FIVE_MIN_LOGIC, SESSION_MINUTES, THIRTY_MIN_LOGIC, hhmm, window_end_5
+from levels import FLAG_LEVELS, UNTOUCHED_LEVELS
+from live import LIVE_FEED_FILE, CsvFeed, LiveTracker
+from memo import StageCache
+from profiling import Profiler, profiling_enabled
+from pipeline import (
+    MOVE_MAP, PRICES_FILE, RANGE_TIMEFRAMES, RULES_FILE, SUMMARY_FILE, TIMEFRAMES, DatasetHolder,
+    FilterSpec, apply_5min, apply_30min, apply_levels, evaluate_symbols, filter_summary, list_symbols, period_breakdown,
+    read_prices, symbol_path,
+)
+
+# Sources are parsed once into Parquet stores partitioned by symbol and timeframe (datastore.sync).
+# A symbol's holder is shared by all sessions, loads on first use and folds rows appended to
+# the source files into the loaded dataset.
+@st.cache_resource
+def get_dataset(symbol):
+    return DatasetHolder(symbol=symbol)
 
 @st.cache_data
-def load_data():
-    summary = pd.read_excel("Daily_Summary_with_Prioritized_Signal.xlsx")
-    summary.columns = summary.columns.str.strip()
-    df_30 = pd.read_csv("NSE_NIFTY, 30.csv", parse_dates=["time"])
-    df_5 = pd.read_csv("NIFTY_5min_All_Sorted.csv", parse_dates=["time"])
-    summary["Date"] = pd.to_datetime(summary["Date"], dayfirst=True)
-    summary["date"] = summary["Date"].dt.date
-    df_30["date"] = df_30["time"].dt.date
-    df_5["date"] = df_5["time"].dt.date
-    # Categorize Prev_Move with new Sideways split
-    if "Prev_Move" not in summary.columns or summary["Prev_Move"].isnull().all():
-        def categorize_prev_move(row):
-            move = row["Move"]
-            if move >= 1.0:
-                return "Very Strong Long"
-            elif 0.4 < move < 1.0:
-                return "Moderate Long"
-            elif 0 < move <= 0.4:
-                return "Long Sideways"
-            elif -0.4 <= move < 0:
-                return "Short Sideways"
-            elif -1.0 < move < -0.4:
-                return "Moderate Short"
-            elif move <= -1.0:
-                return "Very Strong Short"
-            elif move == 0:
-                return "None"
-            else:
-                return "Other"
-        summary["Prev_Move"] = summary.apply(categorize_prev_move, axis=1)
-    return summary, df_30, df_5
-
-summary, df_30min, df_5min = load_data()
-available_5min = set(df_5min["date"].unique())
-available_30min = set(df_30min["date"].unique())
+def load_rules(signature):
+    df_rules = read_snapshot(RULES_FILE)
+    if df_rules is None:
+        df_rules = cached_read(RULES_FILE, pd.read_excel)
+    df_rules.columns = df_rules.columns.str.strip()
+    df_rules["Signal"] = df_rules["Signal"].ffill().astype(str).str.strip()
+    df_rules["View"] = df_rules["View"].ffill().astype(str).str.strip().str.lower()
+    return df_rules
+
+# Chart payloads are built once per prices file version and shared; a chart render only slices one day.
+# A few symbols' charts stay warm.
+@st.cache_resource(max_entries=4)
+def load_charts(symbol, signature):
+    return ChartStore(read_prices(symbol))
+
+# One live tracker per symbol and 5-min window tails the feed for every session (see live.py)
+@st.cache_resource
+def get_live_tracker(symbol, beyond_1010):
+    charts = load_charts(symbol, source_signature(symbol_path(PRICES_FILE, symbol)))
+    return LiveTracker(CsvFeed(symbol_path(LIVE_FEED_FILE, symbol)), charts.previous_levels, beyond_1010)
+
+# Background loads for every session: a cold start renders the summary filters from the summary
+# snapshot while the bars and prices are parsed here (DatasetHolder.warm). One worker: the
+# parsers hold the GIL, so more threads would only slow each other and the page down.
+@st.cache_resource
+def get_warm_pool():
+    return ThreadPoolExecutor(1, thread_name_prefix="warm")
+
+# Count cube of the summary, rebuilt when the summary workbook changes (see cube.py)
+@st.cache_resource(max_entries=4)
+def get_cube(symbol, signature, _summary):
+    return SummaryCube(_summary)
+
+# One stage cache per symbol, shared by all sessions and cleared when the symbol's dataset changes
+@st.cache_resource
+def get_stage_cache(symbol):
+    return StageCache()
 
 st.set_page_config(layout="wide")
-st.title("📊 NIFTY Signal Analyzer")
+symbols = list_symbols()
+symbol = st.sidebar.selectbox("Symbol", symbols) if len(symbols) > 1 else symbols[0]
+st.title(f"📊 {symbol} Signal Analyzer")
+
+# Stage timers, on with SIGNALS_PROFILE=1 or ?profile=1 (see profiling.py)
+profiler = Profiler(profiling_enabled(st.query_params))
+profiler.mark("load_data")
+holder = get_dataset(symbol)
+pending = holder.warm(get_warm_pool())
+if "bars" in pending:
+    # Widgets that need the bars are shown disabled until the background load is done
+    data, data_version = None, 0
+    summary = holder.summary()
+else:
+    data, data_version = holder.get()
+    summary = data.summary
+loading = data is None
+stage_cache = get_stage_cache(symbol)
+stage_cache.set_version(data_version)
+profiler.cache = stage_cache
+
+if pending:
+    @st.fragment(run_every="1s")
+    def warm_up_status():
+        # Rerun the page once the background loads are done
+        still_pending = holder.pending()
+        if not still_pending:
+            st.rerun()
+        st.caption("⏳ Loading " + " and ".join(still_pending) + " in the background…")
+
+    warm_up_status()
 
 # Read selected date from query string
 query_params = st.query_params
@@ -57,6 +113,7 @@ if "candlestick_date" in query_params:
             st.warning("Invalid date format in URL.")
 
 # === Summary Filters
+profiler.mark("summary_filter", len(summary))
 with st.expander("🔍 Filter Summary Data", expanded=True):
     colf1, colf2, colf3 = st.columns(3)
     with colf1:
@@ -68,33 +125,19 @@ with st.expander("🔍 Filter Summary Data", expanded=True):
     with colf3:
         selected_prev = "Any"
         if "Prev_Move" in summary.columns:
-            move_map = {
-                "Very Strong Long": "Very Strong Long (>= 1.00%)",
-                "Moderate Long": "Moderate Long (0.40% to 1.00%)",
-                "Long Sideways": "Long Sideways (0% to +0.40%)",
-                "Short Sideways": "Short Sideways (0% to -0.40%)",
-                "Moderate Short": "Moderate Short (-0.40% to -1.00%)",
-                "Very Strong Short": "Very Strong Short (<= -1.00%)",
-                "None": "None (0%)"
-            }
-            move_opts = ["Any"] + list(move_map.values())
+            move_opts = ["Any"] + list(MOVE_MAP.values())
             selected_prev = st.selectbox("Previous Day Move", move_opts)
 
-filtered = summary.copy()
-if signal != "Any":
-    filtered = filtered[filtered["Signal"] == signal]
-if candle_type != "Any":
-    filtered = filtered[filtered["Candles"] == candle_type]
-if selected_prev != "Any":
-    inv_map = {v: k for k, v in move_map.items()}
-    filtered = filtered[filtered["Prev_Move"] == inv_map[selected_prev]]
+inv_map = {v: k for k, v in MOVE_MAP.items()}
+filtered = filter_summary(summary, signal, candle_type, inv_map.get(selected_prev, "Any"), stage_cache)
+# The same setup as a FilterSpec, for the all-symbols comparison and the cube lookups
+spec = FilterSpec(signal, candle_type, inv_map.get(selected_prev, "Any"))
+cube = get_cube(symbol, source_signature(symbol_path(SUMMARY_FILE, symbol)), summary)
 
 # === Load and Display Entry/Exit Rules for Selected Signal
+profiler.mark("rules", len(filtered))
 try:
-    df_rules = pd.read_excel("Signals.xlsx")
-    df_rules.columns = df_rules.columns.str.strip()
-    df_rules["Signal"] = df_rules["Signal"].ffill().astype(str).str.strip()
-    df_rules["View"] = df_rules["View"].ffill().astype(str).str.strip().str.lower()
+    df_rules = load_rules(source_signature(RULES_FILE))
 
     if signal != "Any":
         matched_rows = df_rules[df_rules["Signal"] == signal]
@@ -122,122 +165,43 @@ except Exception as e:
 # === Signal Confirmation Filters
 colc1, colc2 = st.columns(2)
 with colc1:
+    profiler.mark("confirm_5min", len(filtered))
     with st.expander("🕐 5-Min Confirmation"):
-        enable_5 = st.checkbox("Enable 5-min confirmation")
-        breakout_5 = {}
-        if enable_5:
-            logic_5 = st.radio("Condition", [
-                "Close Above First 30-min High",
-                "Close Below First 30-min Low",
-                "No Breakout (Neither)"
-            ])
-            nox_5 = st.checkbox("(search beyond 10:10)", value=False)
-            valid_5, missing_5 = [], []
-            for day in filtered["date"].unique():
-                if day not in available_5min:
-                    missing_5.append(day)
-                    continue
-                df30 = df_30min[df_30min["date"] == day]
-                if df30.empty: continue
-                h30, l30 = df30.iloc[0]["high"], df30.iloc[0]["low"]
-                df5 = df_5min[df_5min["date"] == day].sort_values("time").reset_index(drop=True)
-                window_end = "15:30" if nox_5 else "10:10"
-                window = df5[df5["time"].dt.time.between(pd.to_datetime("09:45").time(), pd.to_datetime(window_end).time())].reset_index(drop=True)
-                match = False; candle = None; candle_idx = None
-                for idx, row in window.iterrows():
-                    if logic_5 == "Close Above First 30-min High" and row["close"] > h30:
-                        match = True; candle = row; candle_idx = idx; break
-                    elif logic_5 == "Close Below First 30-min Low" and row["close"] < l30:
-                        match = True; candle = row; candle_idx = idx; break
-                    elif logic_5 == "No Breakout (Neither)":
-                        if (window["close"] <= h30).all() and (window["close"] >= l30).all():
-                            match = True; candle = row; candle_idx = idx; break
-                if match:
-                    valid_5.append(day)
-                    last_close = df5.iloc[-1]["close"]
-                    breakout_5[day] = round(last_close - candle["close"], 2)
-                    # Add 5-min candle info (number and time, relative to window)
-                    if "5_Candle_Info" not in filtered.columns:
-                        filtered["5_Candle_Info"] = None
-                    candle_time = candle["time"].strftime("%H:%M")
-                    candle_number = candle_idx + 1
-                    filtered.loc[filtered["date"] == day, "5_Candle_Info"] = f"#{candle_number} ({candle_time})"
-            filtered = filtered[filtered["date"].isin(valid_5)]
-            if breakout_5:
-                filtered["5_Move"] = filtered["date"].map(breakout_5)
-            st.info(f"{len(valid_5)} passed, {len(missing_5)} missing 5-min data")
+        enable_5 = st.checkbox("Enable 5-min confirmation", disabled=loading)
+        if enable_5 and not loading:
+            # The range may be the first candle of any timeframe resampled from the 5-min bars
+            range_5 = st.selectbox(
+                "First candle range", RANGE_TIMEFRAMES, index=RANGE_TIMEFRAMES.index(30), format_func=lambda m: f"{m}-min"
+            )
+            logic_5 = st.radio("Condition", FIVE_MIN_LOGIC, format_func=lambda c: c.replace("30-min", f"{range_5}-min"))
+            # The window stays open 25 minutes after the range candle closes (to 10:10 for 30-min)
+            nox_5 = st.checkbox(f"(search beyond {hhmm(window_end_5(range_5))})", key="nox_5", value=False)
+            filtered, matches_5, missing_5 = apply_5min(filtered, data, logic_5, nox_5, stage_cache, range_5)
+            spec = replace(spec, logic_5=logic_5, beyond_1010=nox_5, range_5=range_5)
+            st.info(f"{len(matches_5)} passed, {len(missing_5)} missing 5-min data")
 
 with colc2:
+    profiler.mark("confirm_30min", len(filtered))
     with st.expander("🕐 30-Min Confirmation"):
-        enable_30 = st.checkbox("Enable 30-min confirmation")
-        breakout_30 = {}
-
-        if enable_30:
-            logic_30 = st.radio("Condition", [
-                "Close Above First 30-min High",
-                "Close Below First 30-min Low",
-                "No Breakout (Neither)",
-                "Goes Above Close Below",
-                "Goes Below Close Above"
-            ])
-
-            auto_30 = st.checkbox("Auto (search all 30-min candles between 09:15–15:15)", value=True)
+        enable_30 = st.checkbox("Enable 30-min confirmation", disabled=loading)
+
+        if enable_30 and not loading:
+            # 30 reads the 30-min file; other timeframes are resampled from the 5-min bars once per dataset
+            timeframe_30 = st.selectbox("Timeframe", TIMEFRAMES, index=TIMEFRAMES.index(30), format_func=lambda m: f"{m}-min")
+            logic_30 = st.radio("Condition", THIRTY_MIN_LOGIC, format_func=lambda c: c.replace("30-min", f"{timeframe_30}-min"))
+
+            auto_30 = st.checkbox(f"Auto (search all {timeframe_30}-min candles between 09:15–15:15)", key="auto_30", value=True)
             candle_nums = st.multiselect(
-                "Candle Numbers (from 2nd)", list(range(2, 14)), default=[2], disabled=auto_30
+                "Candle Numbers (from 2nd)", list(range(2, -(-SESSION_MINUTES // timeframe_30) + 1)), default=[2], disabled=auto_30
             )
 
-            valid_30, missing_30 = [], []
-
-            for day in filtered["date"].unique():
-                df_day = df_30min[df_30min["date"] == day]
-                if df_day.empty:
-                    missing_30.append(day)
-                    continue
-
-                df_day = df_day.sort_values("time").reset_index(drop=True)
-                high, low = df_day.iloc[0]["high"], df_day.iloc[0]["low"]
-
-                if auto_30:
-                    df_window = df_day[
-                        df_day["time"].dt.time.between(pd.to_datetime("09:15").time(), pd.to_datetime("15:15").time())
-                    ].reset_index(drop=True)
-                else:
-                    indices = [i - 1 for i in candle_nums if 0 <= i - 1 < len(df_day)]
-                    df_window = df_day.iloc[indices]
-
-                match = False
-                candle = None
-                for _, row in df_window.iterrows():
-                    ch, cl, cc = row["high"], row["low"], row["close"]
-
-                    if logic_30 == "Close Above First 30-min High" and cc > high:
-                        match = True; candle = row; break
-                    elif logic_30 == "Close Below First 30-min Low" and cc < low:
-                        match = True; candle = row; break
-                    elif logic_30 == "No Breakout (Neither)":
-                        if (df_window["close"] <= high).all() and (df_window["close"] >= low).all():
-                            match = True; candle = df_window.iloc[0]; break
-                    elif logic_30 == "Goes Above Close Below" and ch > high and cc < high:
-                        match = True; candle = row; break
-                    elif logic_30 == "Goes Below Close Above" and cl < low and cc > low:
-                        match = True; candle = row; break
-
-                if match:
-                    valid_30.append(day)
-                    last_close = df_day.iloc[-1]["close"]
-                    breakout_30[day] = round(last_close - candle["close"], 2)
-
-                    # Add candle time or number
-                    if "Candle_Info" not in filtered.columns:
-                        filtered["Candle_Info"] = None
-                    candle_time = candle["time"].strftime("%H:%M")
-                    candle_index = df_day[df_day["time"] == candle["time"]].index[0] + 1
-                    filtered.loc[filtered["date"] == day, "Candle_Info"] = f"#{candle_index} ({candle_time})"
-
-            filtered = filtered[filtered["date"].isin(valid_30)]
-            if breakout_30:
-                filtered["30_Move"] = filtered["date"].map(breakout_30)
-            st.info(f"{len(valid_30)} passed, {len(missing_30)} missing 30-min data")
+            filtered, matches_30, missing_30 = apply_30min(
+                filtered, data, logic_30, None if auto_30 else candle_nums, stage_cache, timeframe_30
+            )
+            st.info(f"{len(matches_30)} passed, {len(missing_30)} missing {timeframe_30}-min data")
+            spec = replace(
+                spec, logic_30=logic_30, timeframe_30=timeframe_30, candles_30=None if auto_30 else tuple(candle_nums)
+            )
 
 
 
@@ -246,77 +210,41 @@ with colc2:
 colf1, colf2 = st.columns(2)
 
 with colf1:
+    profiler.mark("flag_filter", len(filtered))
     with st.expander("📊 30M Above/Below"):
-        enable_flag = st.checkbox("Enable Flag Filter")
-        if enable_flag:
-            level = st.selectbox("Level", ["Any", "High", "Mid", "Low"], key="flag_level")
+        enable_flag = st.checkbox("Enable Flag Filter", disabled=loading)
+        if enable_flag and not loading:
+            levels = st.multiselect("Level", FLAG_LEVELS, key="flag_level", placeholder="Any")
             condition = st.selectbox("Result", ["Any", "Touch & Close Above", "Touch & Close Below", "No Touch"], key="flag_result")
             auto_flag = st.checkbox("Auto (search all 30-min candles between 09:15–15:15)", key="flag_auto", value=True)
             flag_candles = st.multiselect("Candle Numbers", list(range(1, 10)), default=[1], key="flag_candles", disabled=auto_flag)
-            if level != "Any" and condition != "Any":
-                valid_flags = []
-                flag_candle_info = {}
-                for day in filtered["date"].unique():
-                    df_day = df_30min[df_30min["date"] == day].reset_index(drop=True)
-                    if auto_flag:
-                        df_slice = df_day[df_day["time"].dt.time.between(pd.to_datetime("09:15").time(), pd.to_datetime("15:15").time())]
-                    else:
-                        indices = [i - 1 for i in flag_candles if 0 <= i - 1 < len(df_day)]
-                        df_slice = df_day.iloc[indices]
-                    match_row = None
-                    for idx, row in df_slice.iterrows():
-                        if row[level] == condition:
-                            match_row = row
-                            match_idx = idx
-                            break
-                    if match_row is not None:
-                        valid_flags.append(day)
-                        candle_num = match_idx + 1
-                        candle_time = match_row["time"].strftime("%H:%M")
-                        flag_candle_info[day] = f"#{candle_num} ({candle_time})"
-                if "Flag_Candle_Info" not in filtered.columns:
-                    filtered["Flag_Candle_Info"] = None
-                for day, info in flag_candle_info.items():
-                    filtered.loc[filtered["date"] == day, "Flag_Candle_Info"] = info
-                filtered = filtered[filtered["date"].isin(valid_flags)]
+            filtered = apply_levels(
+                filtered, data, "Flag_Candle_Info", levels, condition, None if auto_flag else flag_candles, stage_cache
+            )
+            spec = replace(
+                spec, flag_levels=tuple(levels), flag_result=condition, flag_candles=None if auto_flag else tuple(flag_candles)
+            )
 
 with colf2:
+    profiler.mark("untouched_filter", len(filtered))
     with st.expander("📊 Untouched Filter"):
-        enable_untouched = st.checkbox("Enable Untouched Filter")
-        if enable_untouched:
-            level = st.selectbox("Untouched Level", ["Any", "Untouched High", "Untouched Mid", "Untouched Low"], key="untouched_level")
+        enable_untouched = st.checkbox("Enable Untouched Filter", disabled=loading)
+        if enable_untouched and not loading:
+            levels = st.multiselect("Untouched Level", UNTOUCHED_LEVELS, key="untouched_level", placeholder="Any")
             condition = st.selectbox("Result", ["Any", "Touch & Close Above", "Touch & Close Below", "No Touch"], key="untouched_result")
             auto_untouched = st.checkbox("Auto (search all 30-min candles between 09:15–15:15)", key="untouched_auto", value=True)
             untouched_candles = st.multiselect("Candle Numbers", list(range(1, 10)), default=[2], key="untouched_candles", disabled=auto_untouched)
-            if level != "Any" and condition != "Any":
-                valid_flags = []
-                untouched_candle_info = {}
-                for day in filtered["date"].unique():
-                    df_day = df_30min[df_30min["date"] == day].reset_index(drop=True)
-                    if auto_untouched:
-                        df_slice = df_day[df_day["time"].dt.time.between(pd.to_datetime("09:15").time(), pd.to_datetime("15:15").time())]
-                    else:
-                        indices = [i - 1 for i in untouched_candles if 0 <= i - 1 < len(df_day)]
-                        df_slice = df_day.iloc[indices]
-                    match_row = None
-                    for idx, row in df_slice.iterrows():
-                        if row[level] == condition:
-                            match_row = row
-                            match_idx = idx
-                            break
-                    if match_row is not None:
-                        valid_flags.append(day)
-                        candle_num = match_idx + 1
-                        candle_time = match_row["time"].strftime("%H:%M")
-                        untouched_candle_info[day] = f"#{candle_num} ({candle_time})"
-                if "Untouched_Candle_Info" not in filtered.columns:
-                    filtered["Untouched_Candle_Info"] = None
-                for day, info in untouched_candle_info.items():
-                    filtered.loc[filtered["date"] == day, "Untouched_Candle_Info"] = info
-                filtered = filtered[filtered["date"].isin(valid_flags)]
+            filtered = apply_levels(
+                filtered, data, "Untouched_Candle_Info", levels, condition, None if auto_untouched else untouched_candles, stage_cache
+            )
+            spec = replace(
+                spec, untouched_levels=tuple(levels), untouched_result=condition,
+                untouched_candles=None if auto_untouched else tuple(untouched_candles),
+            )
 
 
 # === Results Section
+profiler.mark("results", len(filtered))
 st.markdown(f"### ✅ Filtered Results: {len(filtered)} Days")
 
 # Add 5_Move.1 column for direction based on 5_Move (must be before summary display)
@@ -326,12 +254,25 @@ if "5_Move" in filtered.columns:
 if filtered.empty:
     st.warning("No matching data found.")
 else:
-    counts = filtered["Move.1"].value_counts()
-    longs, shorts = counts.get("Long", 0), counts.get("Short", 0)
+    # Without intraday stages the headline and period stats are cube lookups
+    summary_only = spec.summary_only()
+    if summary_only:
+        cube_stats = cube.summarize(spec.signal, spec.candles, spec.prev_move)
+        longs, shorts = cube_stats["longs"], cube_stats["shorts"]
+    else:
+        counts = filtered["Move.1"].value_counts()
+        longs, shorts = counts.get("Long", 0), counts.get("Short", 0)
     total = longs + shorts
     long_pct = (longs / total * 100) if total else 0
     short_pct = (shorts / total * 100) if total else 0
     diff = abs(long_pct - short_pct)
+    longs_5 = shorts_5 = 0
+    if "5_Move.1" in filtered.columns:
+        counts_5 = filtered["5_Move.1"].value_counts()
+        longs_5, shorts_5 = counts_5.get("Long", 0), counts_5.get("Short", 0)
+    total_5 = longs_5 + shorts_5
+    # Intervals of the overall and the 5-min split from one batched resampling
+    caption, caption_5 = interval_captions([longs, longs_5], [total, total_5])
 
     if diff < 15:
         long_color = short_color = "gold"
@@ -344,15 +285,19 @@ else:
         f"<span style='color:{short_color}; font-weight:bold'>Short: {shorts} ({short_pct:.2f}%)</span>",
         unsafe_allow_html=True
     )
+    if total:
+        st.caption(caption)
 
 
     if "Move" in filtered.columns:
         st.markdown("### 30M- Move Stats")
-        move_col = filtered["Move"].dropna()
-        long_moves = move_col[move_col > 0]
-        short_moves = move_col[move_col < 0]
-        st.write(f"Avg Long Move: {long_moves.mean():.2f} pts" if not long_moves.empty else "Avg Long Move: N/A")
-        st.write(f"Avg Short Move: {short_moves.mean():.2f} pts" if not short_moves.empty else "Avg Short Move: N/A")
+        if summary_only:
+            avg_long, avg_short = cube_stats["avg_long_move"], cube_stats["avg_short_move"]
+        else:
+            move_col = filtered["Move"].dropna()
+            avg_long, avg_short = move_col[move_col > 0].mean(), move_col[move_col < 0].mean()
+        st.write(f"Avg Long Move: {avg_long:.2f} pts" if pd.notna(avg_long) else "Avg Long Move: N/A")
+        st.write(f"Avg Short Move: {avg_short:.2f} pts" if pd.notna(avg_short) else "Avg Short Move: N/A")
     if "5_Move" in filtered.columns:
         st.markdown("### 5-Min Move Stats")
         move5_col = filtered["5_Move"].dropna()
@@ -362,9 +307,6 @@ else:
         st.write(f"Avg Short 5-Min Move: {short5_moves.mean():.2f} pts" if not short5_moves.empty else "Avg Short 5-Min Move: N/A")
         # 5-min accuracy (Long/Short count and percent) with color formatting
         if "5_Move.1" in filtered.columns:
-            counts_5 = filtered["5_Move.1"].value_counts()
-            longs_5, shorts_5 = counts_5.get("Long", 0), counts_5.get("Short", 0)
-            total_5 = longs_5 + shorts_5
             long_pct_5 = (longs_5 / total_5 * 100) if total_5 else 0
             short_pct_5 = (shorts_5 / total_5 * 100) if total_5 else 0
             diff_5 = abs(long_pct_5 - short_pct_5)
@@ -378,9 +320,12 @@ else:
                 f"<span style='color:{short_color_5}; font-weight:bold'>Short: {shorts_5} ({short_pct_5:.2f}%)</span>",
                 unsafe_allow_html=True
             )
+            if total_5:
+                st.caption(caption_5)
 
-    disp = filtered.sort_values("date", ascending=False).copy()
-    disp["Date"] = pd.to_datetime(disp["Date"]).dt.date
+    profiler.mark("table", len(filtered))
+    disp = filtered.sort_values("Date", ascending=False).copy()
+    disp["Date"] = disp["Date"].dt.date
     # Remove 'Signal' and 'Prev_Move', add 'Candle_Info', '5_Candle_Info', 'Flag_Candle_Info', 'Untouched_Candle_Info', '5_Move.1' if present
     cols = ["Date", "Candles", "Move.1", "Move"]
     for c in ["High", "Mid", "Low", "Untouched High", "Untouched Mid", "Untouched Low", "5_Move", "5_Move.1", "30_Move", "Candle_Info", "5_Candle_Info", "Flag_Candle_Info", "Untouched_Candle_Info"]:
@@ -389,19 +334,18 @@ else:
     st.dataframe(disp[cols].reset_index(drop=True))
 
     # === Candlestick Chart Section with EMA_100 from file ===
-    import plotly.graph_objects as go
-    from datetime import timedelta
-    df_30 = pd.read_excel("NSE_NIFTY, 30 Prices.xlsx", parse_dates=["time"])
-    df_30["date"] = df_30["time"].dt.date
+    profiler.mark("chart", len(filtered))
     # Use filtered table's unique dates for dropdown
     filtered_dates = disp["Date"].drop_duplicates().sort_values(ascending=False)
     selected_date = st.selectbox("\U0001F4C5 View Candlestick Chart for:", filtered_dates)
-    today_data = df_30[df_30["date"] == selected_date]
-    prev_data = df_30[df_30["date"] == selected_date - timedelta(days=1)]
-    if not prev_data.empty:
-        prev_high = prev_data["high"].max()
-        prev_low = prev_data["low"].min()
-        prev_mid = (prev_high + prev_low) / 2
+    charts = None if "prices" in pending else load_charts(symbol, source_signature(symbol_path(PRICES_FILE, symbol)))
+    prev_levels = None if charts is None else charts.previous_levels(date_key(selected_date))
+    if charts is None:
+        st.info("⏳ The chart is available once the prices are loaded.")
+    elif prev_levels is not None:
+        import plotly.graph_objects as go
+        today_data = charts.day(date_key(selected_date))
+        prev_high, prev_low, prev_mid = prev_levels
         fig = go.Figure()
         fig.add_trace(go.Candlestick(
             x=today_data["time"],
@@ -425,7 +369,7 @@ else:
         fig.add_hline(y=prev_low, line=dict(color="white", width=2), opacity=0.5, name="Prev Low")
         fig.add_hline(y=prev_mid, line=dict(color="blue", width=2), opacity=1.0, name="Prev Mid")
         fig.update_layout(
-            title=f"NIFTY 30-min Candles: {selected_date}",
+            title=f"{symbol} 30-min Candles: {selected_date}",
             xaxis_title="Time",
             yaxis_title="Price",
             xaxis_rangeslider_visible=False,
@@ -438,30 +382,19 @@ else:
         st.warning("Previous day data not found.")
 
     # === Accuracy by Period
+profiler.mark("periodic", len(filtered))
 with st.expander("📈 Periodic Accuracy Breakdown"):
     group_by = st.selectbox("Group By", ["Month", "Quarter", "Year"], index=2)
-    dfp = filtered.copy()
-    dfp["Date"] = pd.to_datetime(dfp["date"])
-
-    # Period column logic
-    if group_by == "Month":
-        dfp["Period"] = dfp["Date"].dt.to_period("M").astype(str)
-    elif group_by == "Quarter":
-        dfp["Period"] = dfp["Date"].dt.to_period("Q").astype(str)
+    if spec.summary_only():
+        pivot = cube.breakdown(spec.signal, spec.candles, spec.prev_move, group_by)
     else:
-        dfp["Period"] = dfp["Date"].dt.year.astype(str)
-
-    pivot = dfp.groupby("Period")["Move.1"].value_counts().unstack(fill_value=0)
+        pivot = period_breakdown(filtered, group_by)
 
-    if pivot.empty or pivot.sum(axis=1).sum() == 0:
+    if pivot.empty:
         st.info("ℹ️ Not enough data to display period breakdown.")
     else:
-        pivot["Total"] = pivot.sum(axis=1)
-        pivot["Long %"] = (pivot.get("Long", 0) / pivot["Total"] * 100).round(2)
-        pivot["Short %"] = (pivot.get("Short", 0) / pivot["Total"] * 100).round(2)
-
         # Show only available columns
-        display_cols = ["Total", "Long %", "Short %"]
+        display_cols = ["Total", "Long %", "Short %", "Long % CI (bootstrap)", "Long % CI (Wilson)"]
         if "Long" in pivot.columns:
             display_cols.insert(0, "Long")
         if "Short" in pivot.columns:
@@ -470,11 +403,61 @@ with st.expander("📈 Periodic Accuracy Breakdown"):
         st.dataframe(pivot[display_cols].sort_index())
 
         st.markdown("### 📊 Accuracy Chart")
-        fig, ax = plt.subplots()
-        pivot[["Long %", "Short %"]].plot(kind="bar", ax=ax)
-        plt.xticks(rotation=45)
-        plt.ylabel("Accuracy (%)")
-        plt.title(f"{group_by}ly Accuracy")
-        st.pyplot(fig)
-
-
+        if pending:
+            # Importing and drawing matplotlib competes with the background loads; drawn on the rerun after them
+            st.info("⏳ The chart is drawn once the background loads are done.")
+        else:
+            import matplotlib.pyplot as plt
+            fig, ax = plt.subplots()
+            pivot[["Long %", "Short %"]].plot(kind="bar", ax=ax)
+            plt.xticks(rotation=45)
+            plt.ylabel("Accuracy (%)")
+            plt.title(f"{group_by}ly Accuracy")
+            st.pyplot(fig)
+
+if len(symbols) > 1:
+    profiler.mark("all_symbols", len(filtered))
+    with st.expander("🌐 All Symbols"):
+        # Other symbols load on demand, so this waits for this symbol's bars like the other stages
+        enable_all = st.checkbox("Run the current filters on every symbol", disabled=loading)
+        if enable_all and not loading:
+            holders = {s: get_dataset(s) for s in symbols}
+            caches = {s: get_stage_cache(s) for s in symbols}
+            st.dataframe(evaluate_symbols(spec.normalized(), holders, caches))
+
+# === Live Session: shown while a live 5-min feed is being written for the symbol
+if os.path.exists(symbol_path(LIVE_FEED_FILE, symbol)) and "prices" not in pending:
+    profiler.mark("live", len(filtered))
+    with st.expander("📡 Live Session"):
+        live_beyond = st.checkbox("(search beyond 10:10)", key="live_beyond")
+
+        @st.fragment(run_every="5s")
+        def live_panel():
+            tracker = get_live_tracker(symbol, live_beyond)
+            tracker.poll()
+            live_day, live_conditions, live_levels = tracker.snapshot()
+            if live_day is None:
+                st.info("Waiting for the first bar.")
+                return
+            st.caption(f"Session {live_day} · {tracker.bars} bars · updated {tracker.updated}")
+            st.dataframe(live_conditions, hide_index=True)
+            if not live_levels.empty:
+                st.dataframe(live_levels, hide_index=True)
+
+        live_panel()
+
+with st.expander("🧮 Pipeline Cache"):
+    cache_stats = stage_cache.stats()
+    colm1, colm2, colm3, colm4 = st.columns(4)
+    colm1.metric("Entries", cache_stats["entries"])
+    colm2.metric("Memory", f"{cache_stats['bytes'] / 2**20:.2f} MB")
+    colm3.metric("Hits / Misses", f"{cache_stats['hits']} / {cache_stats['misses']}")
+    colm4.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}", help=f"{cache_stats['evictions']} evicted")
+
+profiler.finish(len(filtered))
+if profiler.enabled:
+    with st.expander("⏱️ Diagnostics"):
+        st.dataframe(profiler.table(), hide_index=True)
+        st.caption(f"Rerun: {profiler.total_ms():.1f} ms, dataset version {data_version}")
+    session_id = st.session_state.setdefault("profile_session", uuid.uuid4().hex[:12])
+    profiler.append_log(session=session_id, dataset_version=data_version)
@@ -0,0 +1,134 @@
+# backtest.py
+"""Headless sweep of analyzer setups.
+
+    python backtest.py --signal all --logic-5 off all --flag-levels off High Mid Low \
+        --flag-result all --min-days 20 --out ranked.csv
+    python backtest.py --logic-30 all --timeframe-30 15 30 60 --out timeframes.csv
+
+Every option takes one or more values; "all" expands to every choice and "off"
+disables a stage. The cartesian grid runs across a process pool and is written
+as a table ranked by the Long/Short edge.
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+from tqdm import tqdm
+
+from cube import SummaryCube
+from engine import FIVE_MIN_LOGIC, THIRTY_MIN_LOGIC
+from levels import FLAG_LEVELS, LEVEL_RESULTS, UNTOUCHED_LEVELS
+from memo import StageCache
+from pipeline import (
+    DEFAULT_SYMBOL, MOVE_MAP, RANGE_TIMEFRAMES, TIMEFRAMES, FilterSpec, apply_filters, load_dataset, summarize,
+)
+
+_data = _cache = _cube = None
+
+
+def _init_worker(root, symbol):
+    # Setups in a chunk share their upstream stages, so each worker keeps its own stage cache
+    global _data, _cache, _cube
+    _data, _cache = load_dataset(root, symbol), StageCache()
+    _cube = SummaryCube(_data.summary)
+
+
+def run_spec(spec):
+    row = {k: (",".join(map(str, v)) if isinstance(v, tuple) else v) for k, v in vars(spec).items()}
+    if spec.summary_only():
+        row.update(_cube.summarize(spec.signal, spec.candles, spec.prev_move))
+    else:
+        row.update(summarize(apply_filters(_data, spec, _cache)))
+    return row
+
+
+def _candle_set(value):
+    # "auto" -> None, "2,3" -> (2, 3)
+    return None if value == "auto" else tuple(int(v) for v in value.split(","))
+
+
+def _minutes(value):
+    return value if value == "all" else int(value)
+
+
+def _level_set(value):
+    return () if value == "off" else tuple(value.split("+"))
+
+
+def build_grid(args, summary):
+    def expand(values, choices):
+        out = []
+        for v in values:
+            out.extend(choices if v == "all" else [v])
+        return list(dict.fromkeys(out))
+
+    def stage(values, choices):
+        return [None if v == "off" else v for v in expand(values, choices)]
+
+    axes = {
+        "signal": expand(args.signal, sorted(summary["Signal"].dropna().unique())),
+        "candles": expand(args.candles, sorted(summary["Candles"].dropna().unique())),
+        "prev_move": expand(args.prev_move, list(MOVE_MAP)),
+        "logic_5": stage(args.logic_5, FIVE_MIN_LOGIC),
+        "beyond_1010": [v == "yes" for v in args.beyond_1010],
+        "range_5": expand(args.range_5, RANGE_TIMEFRAMES),
+        "logic_30": stage(args.logic_30, THIRTY_MIN_LOGIC),
+        "timeframe_30": expand(args.timeframe_30, TIMEFRAMES),
+        "candles_30": [_candle_set(v) for v in args.candles_30],
+        "flag_levels": [_level_set(v) for v in expand(args.flag_levels, FLAG_LEVELS)],
+        "flag_result": expand(args.flag_result, LEVEL_RESULTS),
+        "flag_candles": [_candle_set(v) for v in args.flag_candles],
+        "untouched_levels": [_level_set(v) for v in expand(args.untouched_levels, UNTOUCHED_LEVELS)],
+        "untouched_result": expand(args.untouched_result, LEVEL_RESULTS),
+        "untouched_candles": [_candle_set(v) for v in args.untouched_candles],
+    }
+    specs = (FilterSpec(**dict(zip(axes, combo))).normalized() for combo in itertools.product(*axes.values()))
+    return list(dict.fromkeys(specs))
+
+
+def rank(rows, min_days=1):
+    ranked = pd.DataFrame(rows)
+    ranked = ranked[ranked["days"] >= min_days].copy()
+    ranked["edge"] = (ranked["long_pct"] - ranked["short_pct"]).abs()
+    return ranked.sort_values(["edge", "days"], ascending=False).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--signal", nargs="+", default=["Any"])
+    parser.add_argument("--candles", nargs="+", default=["Any"])
+    parser.add_argument("--prev-move", nargs="+", default=["Any"])
+    parser.add_argument("--logic-5", nargs="+", default=["off"])
+    parser.add_argument("--beyond-1010", nargs="+", default=["no"], choices=["no", "yes"])
+    parser.add_argument("--range-5", nargs="+", type=_minutes, default=[30], help="minutes of the first-candle range, or all")
+    parser.add_argument("--logic-30", nargs="+", default=["off"])
+    parser.add_argument("--timeframe-30", nargs="+", type=_minutes, default=[30], help="minutes, or all")
+    parser.add_argument("--candles-30", nargs="+", default=["auto"], help='"auto" or comma-separated candle numbers')
+    parser.add_argument("--flag-levels", nargs="+", default=["off"], help='"off", "all" or levels joined with "+"')
+    parser.add_argument("--flag-result", nargs="+", default=["Any"])
+    parser.add_argument("--flag-candles", nargs="+", default=["auto"])
+    parser.add_argument("--untouched-levels", nargs="+", default=["off"])
+    parser.add_argument("--untouched-result", nargs="+", default=["Any"])
+    parser.add_argument("--untouched-candles", nargs="+", default=["auto"])
+    parser.add_argument("--min-days", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="backtest_results.csv")
+    args = parser.parse_args(argv)
+
+    data = load_dataset(args.data_dir, args.symbol)
+    specs = build_grid(args, data.summary)
+    print(f"{len(specs)} setups across {args.workers} workers")
+    with ProcessPoolExecutor(args.workers, initializer=_init_worker, initargs=(args.data_dir, args.symbol)) as pool:
+        chunksize = max(1, len(specs) // (args.workers * 8))
+        rows = list(tqdm(pool.map(run_spec, specs, chunksize=chunksize), total=len(specs)))
+    ranked = rank(rows, args.min_days)
+    ranked.to_csv(args.out, index=False)
+    print(ranked.head(20).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# bench.py
+"""Benchmark the analyzer pipeline on synthetic data.
+
+    python bench.py --years 1 5 20 --out bench_results.json
+    python bench.py --years 5 --baseline bench_results.json --tolerance 1.5
+
+A data set per size is written by synth.py under --data-dir (reused when present).
+Each stage - cold and warm load, the summary-only load a cold app start renders from
+(read from the summary snapshot), deriving the level flags and EMA from OHLC, the summary
+filter, every 5-min and 30-min condition, resampling 15/60-min bars from the 5-min ones and a
+condition on them, the flag and untouched filters, the periodic breakdown and the same stats
+from the summary count cube - is timed over --repeat
+runs (best time kept) without the stage cache, then run once more under tracemalloc
+for its peak memory. Results are written as JSON; with --baseline, stages slower than
+tolerance x the baseline are listed and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import datastore
+import features
+import synth
+from charts import ChartStore
+from cube import SummaryCube
+from datastore import read_snapshot, write_snapshot
+from engine import FIVE_MIN_LOGIC, THIRTY_MIN_LOGIC
+from levels import FLAG_LEVELS, LEVEL_RESULTS, UNTOUCHED_LEVELS
+from pipeline import (
+    SUMMARY_FILE, apply_5min, apply_30min, apply_levels, filter_summary, load_dataset, period_breakdown, read_prices,
+    read_source, read_summary, resample_bars, symbol_path,
+)
+
+NOISE_FLOOR = 0.005  # seconds; differences below this are not reported as regressions
+
+
+def measure(fn, repeat=3):
+    # Best wall time over repeat runs, then peak traced memory (MB) of one more run
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return best, peak / 2**20, result
+
+
+def dataset_dir(data_dir, years, seed):
+    root = os.path.join(data_dir, f"{years:g}y-seed{seed}")
+    if not os.path.exists(os.path.join(root, synth.SUMMARY_FILE)):
+        print(f"generating {root}")
+        synth.generate(root, years, seed)
+    return root
+
+
+def stages(root):
+    # (name, fn, rows_in) in app order; fn returns the stage output. Stages get a fresh copy
+    # of the summary, as the app hands them a freshly filtered frame on every rerun.
+    warm_dir, cold_dir = os.path.join(root, ".cache"), os.path.join(root, ".cache-cold")
+
+    def cold_load():
+        # Parse everything into an empty store of its own, leaving the warm stores in place
+        shutil.rmtree(cold_dir, ignore_errors=True)
+        datastore.CACHE_DIR = cold_dir
+        try:
+            return load_dataset(root)
+        finally:
+            datastore.CACHE_DIR = warm_dir
+
+    data = load_dataset(root)
+    summary = filter_summary(data.summary)
+    days = len(summary)
+    prices = read_prices(root=root)
+    summary_path = symbol_path(SUMMARY_FILE, root=root)
+    if read_snapshot(summary_path) is None:
+        write_snapshot(summary_path, read_source("summary", root=root))
+    out = [
+        ("load_cold", cold_load, None),
+        ("load_warm", lambda: load_dataset(root), None),
+        ("load_summary", lambda: read_summary(root=root), None),
+        ("charts", lambda: ChartStore(read_prices(root=root)), None),
+        ("features:flags", lambda: features.level_flags(data.df_30), len(data.df_30)),
+        ("features:prices", lambda: features.price_features(prices), len(prices)),
+        ("summary", lambda: filter_summary(data.summary), len(data.summary)),
+    ]
+    for logic in FIVE_MIN_LOGIC:
+        out.append((f"5min:{logic}", lambda logic=logic: apply_5min(summary.copy(), data, logic)[0], days))
+    for logic in THIRTY_MIN_LOGIC:
+        out.append((f"30min:{logic}", lambda logic=logic: apply_30min(summary.copy(), data, logic)[0], days))
+    for minutes in [15, 60]:
+        out.append((f"resample:{minutes}min", lambda minutes=minutes: resample_bars(data.df_5, minutes), len(data.df_5)))
+        out.append((
+            f"{minutes}min:{THIRTY_MIN_LOGIC[0]}",
+            lambda minutes=minutes: apply_30min(summary.copy(), data, THIRTY_MIN_LOGIC[0], minutes=minutes)[0],
+            days,
+        ))
+    for info_col, levels in [("Flag_Candle_Info", FLAG_LEVELS), ("Untouched_Candle_Info", UNTOUCHED_LEVELS)]:
+        for level in levels:
+            for result in LEVEL_RESULTS:
+                out.append((
+                    f"levels:{level}:{result}",
+                    lambda info_col=info_col, level=level, result=result: apply_levels(summary.copy(), data, info_col, [level], result),
+                    days,
+                ))
+    for group_by in ["Month", "Quarter", "Year"]:
+        out.append((f"periodic:{group_by}", lambda group_by=group_by: period_breakdown(summary, group_by), days))
+    cube = SummaryCube(data.summary)
+    out.append(("cube:build", lambda: SummaryCube(data.summary), len(data.summary)))
+    out.append(("cube:summary", lambda: cube.summarize(), days))
+    for group_by in ["Month", "Quarter", "Year"]:
+        out.append((f"cube:periodic:{group_by}", lambda group_by=group_by: cube.breakdown(group_by=group_by), days))
+    return data, out
+
+
+def run(years, data_dir, seed=0, repeat=3):
+    root = dataset_dir(data_dir, years, seed)
+    datastore.CACHE_DIR = os.path.join(root, ".cache")
+    data, plan = stages(root)
+    size = {
+        "years": years, "days": len(data.summary), "bars_30": len(data.df_30), "bars_5": len(data.df_5),
+        "dataset_mb": round(sum(f.memory_usage(deep=True).sum() for f in data[:3]) / 2**20, 3),
+    }
+    rows = []
+    for name, fn, rows_in in plan:
+        seconds, peak_mb, result = measure(fn, 1 if name == "load_cold" else repeat)
+        rows.append({
+            **size, "stage": name, "seconds": round(seconds, 6), "peak_mb": round(peak_mb, 3),
+            "rows_in": rows_in, "rows_out": len(result) if isinstance(result, pd.DataFrame) else None,
+        })
+        print(f"{years:>5g}y  {name:<45} {seconds * 1000:>10.2f} ms {peak_mb:>10.2f} MB")
+    return rows
+
+
+def regressions(rows, baseline, tolerance):
+    base = {(r["years"], r["stage"]): r for r in baseline["results"]}
+    out = []
+    for r in rows:
+        b = base.get((r["years"], r["stage"]))
+        if b and r["seconds"] > b["seconds"] * tolerance and r["seconds"] - b["seconds"] > NOISE_FLOOR:
+            out.append({"years": r["years"], "stage": r["stage"], "seconds": r["seconds"], "baseline": b["seconds"]})
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", nargs="+", type=float, default=[1.0])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default="bench_data")
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    args = parser.parse_args(argv)
+
+    rows = []
+    for years in args.years:
+        rows.extend(run(years, args.data_dir, args.seed, args.repeat))
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+        "machine": platform.machine(), "cpus": os.cpu_count(), "repeat": args.repeat, "seed": args.seed,
+        "results": rows,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=1)
+    print(f"wrote {len(rows)} results to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            slow = regressions(rows, json.load(f), args.tolerance)
+        for r in slow:
+            print(f"REGRESSION {r['years']:g}y {r['stage']}: {r['seconds']:.4f}s vs {r['baseline']:.4f}s")
+        if slow:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
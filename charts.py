@@ -0,0 +1,48 @@
+# charts.py
+import numpy as np
+import pandas as pd
+
+from engine import DayIndex, day_keys
+
+CHART_COLUMNS = ["open", "high", "low", "close", "EMA_100"]
+
+
+def date_key(d):
+    # yyyymmdd key for a date/Timestamp, matching engine.day_keys
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+class ChartStore:
+    """Per-trading-day chart payloads built once from the prices frame.
+
+    The OHLC + EMA_100 columns are kept as one contiguous float block addressed by a
+    DayIndex, so a day's candles are a row slice. levels holds each session's
+    high/low/mid; the previous session is the previous trading day in the index, not
+    the previous calendar day, so Mondays and post-holiday sessions resolve correctly.
+    """
+
+    def __init__(self, prices):
+        prices = prices.dropna(subset=["time"]).sort_values("time", kind="stable").reset_index(drop=True)
+        self.idx = DayIndex(day_keys(prices["time"]))
+        self.times = prices["time"]
+        self.block = prices[CHART_COLUMNS].to_numpy(np.float64)
+        if len(self.idx):
+            high = np.fmax.reduceat(self.block[:, 1], self.idx.starts)
+            low = np.fmin.reduceat(self.block[:, 2], self.idx.starts)
+        else:
+            high = low = np.empty(0)
+        self.levels = np.column_stack([high, low, (high + low) / 2])
+
+    def day(self, key):
+        # Candles for one trading day (empty frame when the day has no bars)
+        start, end = self.idx.bounds(key)
+        out = pd.DataFrame(self.block[start:end], columns=CHART_COLUMNS)
+        out.insert(0, "time", self.times.iloc[start:end].reset_index(drop=True))
+        return out
+
+    def previous_levels(self, key):
+        # (high, low, mid) of the last trading day before key, None when there is none
+        pos = int(np.searchsorted(self.idx.keys, key)) - 1
+        if pos < 0:
+            return None
+        return tuple(float(v) for v in self.levels[pos])
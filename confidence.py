@@ -0,0 +1,60 @@
+# confidence.py
+import numpy as np
+import pandas as pd
+
+BOOTSTRAP_SAMPLES = 2000
+LEVEL = 0.95
+Z = 1.959963984540054  # two-sided 95% normal quantile
+
+
+def wilson_interval(longs, totals, z=Z):
+    # Wilson score interval of the Long share (%) per group; NaN for groups without days
+    longs, totals = np.asarray(longs, np.float64), np.asarray(totals, np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        p = longs / totals
+        denom = 1 + z**2 / totals
+        centre = (p + z**2 / (2 * totals)) / denom
+        half = z * np.sqrt(p * (1 - p) / totals + z**2 / (4 * totals**2)) / denom
+    return (centre - half) * 100, (centre + half) * 100
+
+
+def bootstrap_interval(longs, totals, samples=BOOTSTRAP_SAMPLES, level=LEVEL, seed=0):
+    """Percentile bootstrap interval of the Long share (%) per group, every group in one draw.
+
+    Resampling a group's n days with replacement gives Binomial(n, longs / n) Long days, so
+    the groups x samples matrix of resampled shares is a single rng.binomial call. The fixed
+    seed keeps the bounds steady across reruns.
+    """
+    longs, totals = np.asarray(longs, np.int64), np.asarray(totals, np.int64)
+    lo, hi = np.full(len(totals), np.nan), np.full(len(totals), np.nan)
+    ok = totals > 0
+    if ok.any():
+        # Groups with the same counts share their resamples
+        (k, n), inverse = np.unique(np.stack([longs[ok], totals[ok]]), axis=1, return_inverse=True)
+        draws = np.random.default_rng(seed).binomial(n[:, None], (k / n)[:, None], size=(len(n), samples))
+        tail = (1 - level) / 2
+        bounds = np.quantile(draws, [tail, 1 - tail], axis=1) / n * 100
+        lo[ok], hi[ok] = bounds[:, inverse.ravel()]
+    return lo, hi
+
+
+def _label(lo, hi):
+    return [f"{a:.1f}–{b:.1f}" if np.isfinite(a) else "" for a, b in zip(lo, hi)]
+
+
+def split_intervals(longs, totals, index=None):
+    # Bootstrap and Wilson 95% intervals of Long % per group, as display strings
+    return pd.DataFrame({
+        "Long % CI (bootstrap)": _label(*bootstrap_interval(longs, totals)),
+        "Long % CI (Wilson)": _label(*wilson_interval(longs, totals)),
+    }, index=index)
+
+
+def interval_captions(longs, totals):
+    # Caption per split, every split's intervals from one split_intervals call; "" for splits without days
+    rows = split_intervals(longs, totals)
+    return [
+        f"95% CI of Long %: {boot} (bootstrap, {BOOTSTRAP_SAMPLES} resamples), {wilson} (Wilson), over {total} days"
+        if boot else ""
+        for boot, wilson, total in zip(rows.iloc[:, 0], rows.iloc[:, 1], totals)
+    ]
@@ -0,0 +1,114 @@
+# cube.py
+import numpy as np
+import pandas as pd
+
+from confidence import split_intervals
+
+CUBE_DIMS = ["Signal", "Candles", "Prev_Move"]
+MEASURES = ["days", "labelled", "longs", "shorts", "up_n", "up_sum", "down_n", "down_sum"]
+
+
+def _period_labels(months, group_by):
+    # Labels as period_breakdown makes them, for month ordinals (year * 12 + month - 1)
+    years, month = months // 12, months % 12 + 1
+    if group_by == "Month":
+        return [f"{y}-{m:02d}" for y, m in zip(years, month)]
+    if group_by == "Quarter":
+        return [f"{y}Q{(m - 1) // 3 + 1}" for y, m in zip(years, month)]
+    return [str(y) for y in years]
+
+
+class SummaryCube:
+    """Day counts and Move sums of the summary over Signal x Candles x Prev_Move x Month.
+
+    Built once per summary. A summary-only filter picks one label or all of each dimension,
+    so its headline stats and period breakdown are sums over a slice of the cube, however
+    many rows the summary has. Missing labels get a slot of their own that only "Any"
+    selects, like the row filters; undated rows sit in a last month slot that the period
+    breakdown leaves out.
+    """
+
+    def __init__(self, summary):
+        codes, shape, self.labels = [], [], {}
+        for dim in CUBE_DIMS:
+            dim_codes, uniques = pd.factorize(summary[dim], use_na_sentinel=False)
+            codes.append(dim_codes)
+            shape.append(len(uniques))
+            self.labels[dim] = {label: i for i, label in enumerate(uniques) if not pd.isna(label)}
+        dates = summary["Date"]
+        ordinals = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy(np.float64)
+        dated = ~np.isnan(ordinals)
+        self.months = np.unique(ordinals[dated]).astype(np.int64)
+        month_codes = np.full(len(summary), len(self.months))
+        month_codes[dated] = np.searchsorted(self.months, ordinals[dated])
+        codes.append(month_codes)
+        shape.append(len(self.months) + 1)
+        # Months are sorted, so each period is a run of them: labels and run starts per grouping
+        self.periods = {}
+        for group_by in ["Month", "Quarter", "Year"]:
+            labels = np.array(_period_labels(self.months, group_by), dtype=object)
+            starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]]) if len(labels) else np.zeros(0, np.int64)
+            self.periods[group_by] = (pd.Index(labels[starts], dtype="str", name="Period"), starts)
+
+        flat = np.ravel_multi_index(codes, shape)
+        label = summary["Move.1"]
+        move = summary["Move"].to_numpy(np.float64)
+        weights = [
+            np.ones(len(summary)), label.notna().to_numpy(), (label == "Long").to_numpy(), (label == "Short").to_numpy(),
+            move > 0, np.where(move > 0, move, 0), move < 0, np.where(move < 0, move, 0),
+        ]
+        size = int(np.prod(shape))
+        self.cube = np.stack([np.bincount(flat, w.astype(np.float64), size) for w in weights]).reshape([len(MEASURES)] + shape)
+
+    def _by_month(self, signal="Any", candles="Any", prev_move="Any"):
+        # measures x month slots of the selected cells
+        index = [slice(None)]
+        for dim, value in zip(CUBE_DIMS, (signal, candles, prev_move)):
+            if value == "Any":
+                index.append(slice(None))
+            elif value in self.labels[dim]:
+                code = self.labels[dim][value]
+                index.append(slice(code, code + 1))
+            else:
+                return np.zeros((len(MEASURES), len(self.months) + 1))
+        return self.cube[tuple(index)].sum(axis=(1, 2, 3))
+
+    def summarize(self, signal="Any", candles="Any", prev_move="Any"):
+        # pipeline.summarize of the filtered summary
+        m = dict(zip(MEASURES, self._by_month(signal, candles, prev_move).sum(axis=1)))
+        longs, shorts = int(m["longs"]), int(m["shorts"])
+        total = longs + shorts
+        return {
+            "days": int(m["days"]),
+            "longs": longs,
+            "shorts": shorts,
+            "long_pct": round(longs / total * 100, 2) if total else 0,
+            "short_pct": round(shorts / total * 100, 2) if total else 0,
+            "avg_long_move": m["up_sum"] / m["up_n"] if m["up_n"] else np.nan,
+            "avg_short_move": m["down_sum"] / m["down_n"] if m["down_n"] else np.nan,
+        }
+
+    def breakdown(self, signal="Any", candles="Any", prev_move="Any", group_by="Year"):
+        # pipeline.period_breakdown of the filtered summary (its Long/Short/Total/% and interval columns)
+        periods, starts = self.periods[group_by if group_by in self.periods else "Year"]
+        if not len(periods):
+            return pd.DataFrame(index=periods)
+        by_month = self._by_month(signal, candles, prev_move)[:, :-1]
+        sums = dict(zip(MEASURES, np.add.reduceat(by_month, starts, axis=1).astype(np.int64)))
+        keep = sums["labelled"] > 0
+        if not keep.any():
+            return pd.DataFrame(index=periods[:0])
+        longs, shorts, total = sums["longs"][keep], sums["shorts"][keep], sums["labelled"][keep]
+        columns = {}
+        if longs.any():
+            columns["Long"] = longs
+        if shorts.any():
+            columns["Short"] = shorts
+        columns.update({
+            "Total": total,
+            "Long %": np.round(longs / total * 100, 2),
+            "Short %": np.round(shorts / total * 100, 2),
+        })
+        intervals = split_intervals(longs, total)
+        columns.update({name: intervals[name].to_numpy() for name in intervals.columns})
+        return pd.DataFrame(columns, index=periods[keep])
@@ -0,0 +1,191 @@
+# datastore.py
+import glob
+import hashlib
+import io
+import json
+import os
+
+import pandas as pd
+
+CACHE_DIR = os.environ.get("SIGNALS_CACHE_DIR", ".cache")
+STORE_VERSION = 2
+
+
+def file_hash(path, limit=None, chunk_size=1 << 20):
+    # sha256 of the file, or of its first limit bytes
+    h = hashlib.sha256()
+    remaining = os.path.getsize(path) if limit is None else limit
+    with open(path, "rb") as f:
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            h.update(chunk)
+            remaining -= len(chunk)
+    return h.hexdigest()
+
+
+def source_signature(*paths):
+    # Cheap (size, mtime) fingerprint, used as a st.cache_data argument so in-memory caches follow file edits
+    return tuple((p, os.path.getsize(p), os.stat(p).st_mtime_ns) for p in paths if os.path.exists(p))
+
+
+def _cache_paths(path, partition=None):
+    # partition is a (symbol, timeframe) pair -> CACHE_DIR/symbol/timeframe.*; else named after the file
+    if partition is not None:
+        base = os.path.join(CACHE_DIR, *partition)
+    else:
+        base = os.path.join(CACHE_DIR, os.path.basename(path).replace(" ", "_").replace(",", ""))
+    return base + ".parquet", base + ".json"
+
+
+def _part_path(data_path, n):
+    return data_path[:-len(".parquet")] + f".part{n:04d}.parquet"
+
+
+def _write_atomic(path, write):
+    tmp = f"{path}.tmp{os.getpid()}"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_meta(path, meta):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+    _write_atomic(path, write)
+
+
+def _read_meta(path, partition=None):
+    data_path, meta_path = _cache_paths(path, partition)
+    if not (os.path.exists(meta_path) and os.path.exists(data_path)):
+        return {}
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def _tail(df):
+    # Last row as a JSON record; compared across reads and handed to prepare hooks
+    return df.tail(1).to_json(orient="records", date_format="iso", date_unit="ns")
+
+
+def _appended_rows(path, reader, meta, kwargs):
+    # New rows when the source only grew at the end since it was stored, else None
+    size = os.path.getsize(path)
+    if size <= meta["size"]:
+        return None
+    if path.lower().endswith(".csv"):
+        if file_hash(path, meta["size"]) != meta["sha256"]:
+            return None
+        with open(path, "rb") as f:
+            header = f.readline()
+            f.seek(meta["size"] - 1)
+            if f.read(1) != b"\n":
+                return None
+            tail = f.read()
+        return reader(io.BytesIO(header + tail), **kwargs)
+    # Workbooks cannot be read from an offset; re-read and keep the rows past the stored ones
+    df = reader(path, **kwargs)
+    rows = meta["rows"]
+    if len(df) <= rows or (rows and _tail(df.iloc[rows - 1:rows]) != meta["source_tail"]):
+        return None
+    return df.iloc[rows:].reset_index(drop=True)
+
+
+def sync(path, reader, prepare=None, partition=None, **kwargs):
+    """Bring the Parquet store for a source file up to date.
+
+    The store is a base Parquet copy plus append-only parts, described by a JSON sidecar
+    with the source size, mtime, sha256 and reader options. When the source only grew at
+    the end (new bars or summary rows) just the new rows are parsed and stored as a part;
+    any other change rebuilds the base. prepare(rows, last) derives extra columns for
+    the new rows, with last the previous stored row as a dict (None on a rebuild).
+    partition names the store by (symbol, timeframe) instead of by file name.
+
+    Returns (status, rows): ("unchanged", None), ("appended", new rows) or ("rebuilt", all rows).
+    """
+    data_path, meta_path = _cache_paths(path, partition)
+    stat = os.stat(path)
+    options = f"{reader.__module__}.{reader.__name__}({sorted(kwargs.items())!r})"
+    if prepare is not None:
+        options += f"|{prepare.__module__}.{prepare.__name__}"
+    meta = _read_meta(path, partition)
+
+    if meta.get("version") == STORE_VERSION and meta.get("options") == options and meta.get("source") == path:
+        if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+            return "unchanged", None
+        digest = file_hash(path)
+        if meta["size"] == stat.st_size and meta["sha256"] == digest:
+            meta["mtime_ns"] = stat.st_mtime_ns
+            _write_meta(meta_path, meta)
+            return "unchanged", None
+        rows = _appended_rows(path, reader, meta, kwargs)
+        if rows is not None:
+            source_tail = _tail(rows)
+            if prepare is not None:
+                rows = prepare(rows, json.loads(meta["tail"])[0])
+            if len(rows):
+                part = _part_path(data_path, len(meta["parts"]) + 1)
+                _write_atomic(part, lambda tmp: rows.to_parquet(tmp, index=False))
+                meta["parts"].append(os.path.basename(part))
+                meta.update(rows=meta["rows"] + len(rows), tail=_tail(rows), source_tail=source_tail)
+            meta.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns, sha256=digest)
+            _write_meta(meta_path, meta)
+            return "appended", rows
+    else:
+        digest = file_hash(path)
+
+    df = reader(path, **kwargs)
+    source_tail = _tail(df)
+    if prepare is not None:
+        df = prepare(df, None)
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    for part in glob.glob(glob.escape(data_path[:-len(".parquet")]) + ".part*.parquet"):
+        os.remove(part)
+    _write_atomic(data_path, lambda tmp: df.to_parquet(tmp, index=False))
+    meta = {
+        "version": STORE_VERSION, "source": path, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest, "options": options,
+        "rows": len(df), "tail": _tail(df), "source_tail": source_tail, "parts": [],
+    }
+    _write_meta(meta_path, meta)
+    return "rebuilt", df
+
+
+def read_store(path, partition=None):
+    # Stored rows: the base copy plus any appended parts
+    data_path, _ = _cache_paths(path, partition)
+    parts = [os.path.join(os.path.dirname(data_path), p) for p in _read_meta(path, partition).get("parts", [])]
+    frames = [pd.read_parquet(data_path)] + [pd.read_parquet(p) for p in parts]
+    return pd.concat(frames, ignore_index=True) if parts else frames[0]
+
+
+def snapshot_path(path):
+    return os.path.splitext(path)[0] + ".snapshot.parquet"
+
+
+def write_snapshot(path, df):
+    """Parquet copy of a source's rows next to the source, tagged with the source's sha256.
+
+    Unlike the store under CACHE_DIR it is committed with the data, so a fresh checkout can
+    read the rows without the source's parser.
+    """
+    df = df.copy()
+    df.attrs = {"source_sha256": file_hash(path)}
+    _write_atomic(snapshot_path(path), lambda tmp: df.to_parquet(tmp, index=False))
+
+
+def read_snapshot(path):
+    # Snapshot rows, or None when there is none or the source changed since it was written
+    snap = snapshot_path(path)
+    if not (os.path.exists(snap) and os.path.exists(path)):
+        return None
+    df = pd.read_parquet(snap)
+    if df.attrs.pop("source_sha256", None) != file_hash(path):
+        return None
+    return df
+
+
+def cached_read(path, reader, prepare=None, partition=None, **kwargs):
+    """Read a source file through its Parquet store (see sync), parsing only what changed."""
+    status, df = sync(path, reader, prepare, partition, **kwargs)
+    return df if status == "rebuilt" else read_store(path, partition)
@@ -0,0 +1,239 @@
+# engine.py
+import numpy as np
+import pandas as pd
+
+# Session times as minutes of the day, shared by the batch engine, the resampler and the live tracker
+SESSION_OPEN = 9 * 60 + 15
+SESSION_END = 15 * 60 + 30
+SESSION_MINUTES = SESSION_END - SESSION_OPEN
+LAST_CANDLE = 15 * 60 + 15  # last 30-min candle searched in Auto mode
+WINDOW_5 = 25  # minutes the 5-min window stays open after the range candle closes (09:45-10:10 for 30-min)
+
+
+def day_keys(dates):
+    # yyyymmdd int64 keys from a datetime Series (local wall-clock date for tz-aware times), NaT -> 0
+    keys = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return keys.fillna(0).to_numpy(np.int64)
+
+
+class DayIndex:
+    """Row-offset index over a bar frame sorted by time: day key -> [start, end)."""
+
+    def __init__(self, keys):
+        keys = np.asarray(keys, dtype=np.int64)
+        self.keys, self.starts = np.unique(keys, return_index=True)
+        self.ends = np.append(self.starts[1:], len(keys))[:len(self.starts)]
+        self._pos = {k: i for i, k in enumerate(self.keys.tolist())}
+
+    def extended(self, keys, offset):
+        # Index after appending rows with these (sorted, later) keys at row offset
+        add = DayIndex(keys)
+        out = DayIndex([])
+        starts, ends = add.starts + offset, add.ends + offset
+        head_keys, head_starts, head_ends = self.keys, self.starts, self.ends.copy()
+        if len(add) and len(self) and add.keys[0] == self.keys[-1]:
+            # The first appended bars continue the last stored day
+            head_ends[-1] = ends[0]
+            add.keys, starts, ends = add.keys[1:], starts[1:], ends[1:]
+        out.keys = np.concatenate([head_keys, add.keys])
+        out.starts = np.concatenate([head_starts, starts])
+        out.ends = np.concatenate([head_ends, ends])
+        out._pos = dict(self._pos)
+        out._pos.update((k, len(self) + i) for i, k in enumerate(add.keys.tolist()))
+        return out
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._pos
+
+    def bounds(self, key):
+        i = self._pos.get(key)
+        if i is None:
+            return 0, 0
+        return int(self.starts[i]), int(self.ends[i])
+
+    def positions(self, keys):
+        # Vectorized day ordinals for an array of keys (0 where absent) and a presence mask
+        keys = np.asarray(keys, dtype=np.int64)
+        pos = np.searchsorted(self.keys, keys)
+        present = pos < len(self.keys)
+        present[present] = self.keys[pos[present]] == keys[present]
+        return np.where(present, pos, 0), present
+
+    def lookup(self, keys):
+        # Vectorized bounds: (starts, ends, present) for an array of day keys, empty range when absent
+        pos, present = self.positions(keys)
+        starts = np.zeros(len(keys), dtype=np.int64)
+        ends = np.zeros(len(keys), dtype=np.int64)
+        starts[present] = self.starts[pos[present]]
+        ends[present] = self.ends[pos[present]]
+        return starts, ends, present
+
+    def slice(self, df, key):
+        start, end = self.bounds(key)
+        return df.iloc[start:end]
+
+
+def minute_of_day(times):
+    return (times.dt.hour * 60 + times.dt.minute).to_numpy(np.int64)
+
+
+def session_bucket(minute, minutes):
+    # Start minute of the session-aligned candle of a timeframe (from the 09:15 open) holding each minute
+    return SESSION_OPEN + (minute - SESSION_OPEN) // minutes * minutes
+
+
+def window_end_5(range_minutes=30, beyond_1010=False):
+    # Last 5-min bar start searched against a first range_minutes range: the session end when searching beyond
+    return SESSION_END if beyond_1010 else SESSION_OPEN + range_minutes + WINDOW_5
+
+
+def hhmm(minutes):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _day_rows(idx, keys, mask=None):
+    # Rows of the requested days laid out one day per line: (n_keys x width) row numbers, -1 padded.
+    # Days missing from the index and rows failing mask are left out.
+    starts, ends, _ = idx.lookup(keys)
+    lens = ends - starts
+    line = np.repeat(np.arange(len(keys)), lens)
+    rows = np.repeat(starts - np.cumsum(lens) + lens, lens) + np.arange(lens.sum())
+    if mask is not None:
+        keep = mask[rows]
+        line, rows = line[keep], rows[keep]
+    col = np.arange(len(rows)) - np.searchsorted(line, line)
+    width = int(col.max()) + 1 if len(col) else 0
+    mat = np.full((len(keys), width), -1, dtype=np.int64)
+    mat[line, col] = rows
+    return mat
+
+
+def _first_true(hit):
+    # Column of the first True per line, -1 where a line has none
+    if hit.shape[1] == 0:
+        return np.full(hit.shape[0], -1)
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), -1)
+
+
+def _matches(keys, mat, line, col, close, minute, last_close):
+    rows = mat[line, col]
+    # Moves in float64 so float32 bars still round to the quoted 2 decimals
+    moves = np.round(last_close[line].astype(np.float64) - close[rows], 2)
+    times = [hhmm(int(m)) for m in minute[rows]]
+    return pd.DataFrame({
+        "candle": col + 1,
+        "time": times,
+        "move": moves,
+        "candle_info": [f"#{c} ({t})" for c, t in zip(col + 1, times)],
+    }, index=pd.Index(np.asarray(keys, dtype=np.int64)[line], name="day_key"))
+
+
+FIVE_MIN_LOGIC = [
+    "Close Above First 30-min High",
+    "Close Below First 30-min Low",
+    "No Breakout (Neither)",
+]
+
+
+def confirm_5min(keys, df_5, idx_5, df_30, idx_30, logic, beyond_1010=False, range_minutes=30):
+    """First 5-min close beyond the first 30-min range, from 09:45 to 10:10 (or 15:30).
+
+    df_30/idx_30 may be bars of any timeframe, given as range_minutes: the range is then
+    their first candle and the window runs from its close for 25 minutes (window_end_5),
+    e.g. 10:15-10:40 for a 60-min range.
+    Returns (matches, missing): matches is indexed by day_key with candle number
+    (within the window), time, move to the day's last close and the display info;
+    missing lists the keys with no 5-min bars.
+    """
+    keys = np.unique(np.asarray(keys, dtype=np.int64))
+    close, minute = df_5["close"].to_numpy(), df_5["minute"].to_numpy()
+    window_end = window_end_5(range_minutes, beyond_1010)
+    in_window = (minute >= SESSION_OPEN + range_minutes) & (minute <= window_end)
+    mat = _day_rows(idx_5, keys, in_window)
+    _, ends_5, has_5 = idx_5.lookup(keys)
+    starts_30, _, has_30 = idx_30.lookup(keys)
+
+    valid = mat >= 0
+    c = np.where(valid, close[mat], np.nan)
+    h30 = np.where(has_30, df_30["high"].to_numpy()[starts_30], np.nan)[:, None]
+    l30 = np.where(has_30, df_30["low"].to_numpy()[starts_30], np.nan)[:, None]
+
+    if logic == "Close Above First 30-min High":
+        col = _first_true(c > h30)
+    elif logic == "Close Below First 30-min Low":
+        col = _first_true(c < l30)
+    elif logic == "No Breakout (Neither)":
+        inside = ((c <= h30) & (c >= l30)) | ~valid
+        col = np.where(inside.all(axis=1) & valid.any(axis=1), 0, -1)
+    else:
+        raise ValueError(f"Unknown 5-min condition: {logic}")
+
+    col = np.where(has_30, col, -1)
+    line = np.flatnonzero(col >= 0)
+    last_close = close[ends_5 - 1]
+    return _matches(keys, mat, line, col[line], close, minute, last_close), keys[~has_5]
+
+
+THIRTY_MIN_LOGIC = [
+    "Close Above First 30-min High",
+    "Close Below First 30-min Low",
+    "No Breakout (Neither)",
+    "Goes Above Close Below",
+    "Goes Below Close Above",
+]
+
+
+def _candle_columns(mat, minute, candle_nums):
+    # Day columns to search, in search order, and which of them hold a candle in the window.
+    # Auto (candle_nums None) searches every candle between 09:15 and 15:15.
+    if candle_nums is None:
+        order = np.arange(mat.shape[1])
+        sub = mat
+        in_window = (sub >= 0) & (minute[sub] >= SESSION_OPEN) & (minute[sub] <= LAST_CANDLE)
+    else:
+        order = np.array([i - 1 for i in candle_nums if 0 <= i - 1 < mat.shape[1]], dtype=np.int64)
+        sub = mat[:, order]
+        in_window = sub >= 0
+    return order, sub, in_window
+
+
+def confirm_30min(keys, df_30, idx_30, logic, candle_nums=None):
+    """First 30-min candle meeting logic against the day's first candle high/low.
+
+    Works the same on bars of any timeframe (pipeline.Timeframes). Searches candles
+    starting 09:15-15:15 when candle_nums is None (Auto), else the given 1-based
+    candle numbers in the order given. Returns (matches, missing) like confirm_5min,
+    with candle numbers counted from the day's first candle.
+    """
+    keys = np.unique(np.asarray(keys, dtype=np.int64))
+    close, minute = df_30["close"].to_numpy(), df_30["minute"].to_numpy()
+    mat = _day_rows(idx_30, keys)
+    starts, ends, present = idx_30.lookup(keys)
+    order, sub, in_window = _candle_columns(mat, minute, candle_nums)
+
+    h = np.where(present, df_30["high"].to_numpy()[starts], np.nan)[:, None]
+    l = np.where(present, df_30["low"].to_numpy()[starts], np.nan)[:, None]
+    ch = np.where(in_window, df_30["high"].to_numpy()[sub], np.nan)
+    cl = np.where(in_window, df_30["low"].to_numpy()[sub], np.nan)
+    cc = np.where(in_window, close[sub], np.nan)
+
+    if logic == "Close Above First 30-min High":
+        first = _first_true(cc > h)
+    elif logic == "Close Below First 30-min Low":
+        first = _first_true(cc < l)
+    elif logic == "No Breakout (Neither)":
+        inside = ((cc <= h) & (cc >= l)) | ~in_window
+        first = np.where(inside.all(axis=1), _first_true(in_window), -1)
+    elif logic == "Goes Above Close Below":
+        first = _first_true((ch > h) & (cc < h))
+    elif logic == "Goes Below Close Above":
+        first = _first_true((cl < l) & (cc > l))
+    else:
+        raise ValueError(f"Unknown 30-min condition: {logic}")
+
+    line = np.flatnonzero(first >= 0)
+    last_close = close[ends - 1]
+    return _matches(keys, mat, line, order[first[line]], close, minute, last_close), keys[~present]
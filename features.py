@@ -0,0 +1,188 @@
+# features.py
+"""Level flags and EMA_100 derived from 30-min OHLC.
+
+    python features.py [--data-dir .] [--symbol NIFTY] [--write]
+
+Recomputes the High/Low/Mid and Untouched flag columns of the 30-min bar file and the
+Yesterday levels and EMA_100 of the prices workbook from their OHLC columns, and reports
+how many rows agree with the stored columns. --write replaces the stored columns with the
+derived ones; rows whose levels need sessions from before the file keep their stored values,
+as does the EMA's first row, which the recurrence continues from. Everything is array
+operations over per-session runs of the bars, so years of history take well under a second.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import day_keys
+from levels import FLAG_LEVELS, LEVEL_RESULTS, UNTOUCHED_LEVELS
+
+NO_TOUCH, ABOVE, BELOW = LEVEL_RESULTS
+EMA_SPAN = 100
+BAR_COLUMNS = ["time", "open", "high", "low", "close"]
+FLAG_COLUMNS = ["High", "Low", "Mid", "Untouched High", "Untouched Low", "Untouched Mid"]  # bar file order
+PRICE_LEVEL_COLUMNS = ["Yesterday High", "Yesterday Low", "Yesterday Mid"]
+
+
+def session_levels(times, high, low):
+    """Per-bar high, mid and low of the previous session and of the session before it.
+
+    Bars must be sorted by time, so each session is one run of rows: the session extremes
+    are one reduceat over the runs and each bar reads them two and one runs back. Returns
+    {level name: per-bar array}, NaN where the file has no such session.
+    """
+    keys = day_keys(times)
+    high, low = np.asarray(high, np.float64), np.asarray(low, np.float64)
+    if not len(keys):
+        return {level: np.zeros(0) for level in FLAG_LEVELS + UNTOUCHED_LEVELS}
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    session = np.cumsum(np.r_[True, keys[1:] != keys[:-1]]) - 1
+    highs, lows = np.maximum.reduceat(high, starts), np.minimum.reduceat(low, starts)
+    daily = {"High": highs, "Mid": (highs + lows) / 2, "Low": lows}
+
+    def back(values, n):
+        # values[session - n] per bar, NaN for the first n sessions
+        return np.r_[np.full(n, np.nan), values[:-n]][session] if len(values) > n else np.full(len(keys), np.nan)
+
+    out = {level: back(daily[level], 1) for level in FLAG_LEVELS}
+    out.update({f"Untouched {level}": back(daily[level], 2) for level in FLAG_LEVELS})
+    return out
+
+
+def touch_flags(high, low, close, level, beyond=None):
+    """Flag per bar for one level: a bar whose range holds the level closes above or below it.
+
+    beyond="above" also marks bars wholly above the level as Touch & Close Above (the High
+    flag), beyond="below" bars wholly below it as Touch & Close Below (the Low flag). Bars
+    without a level are No Touch.
+    """
+    touch = (low <= level) & (level <= high)
+    out = np.where(touch, np.where(close > level, ABOVE, BELOW), NO_TOUCH)
+    if beyond == "above":
+        out = np.where(low > level, ABOVE, out)
+    elif beyond == "below":
+        out = np.where(high < level, BELOW, out)
+    return out.astype(object)
+
+
+def level_flags(df, levels=None):
+    """The six flag columns of the 30-min bar file, from its time and OHLC.
+
+    High/Low/Mid test the previous session's high, low and (high + low) / 2, the Untouched
+    columns the same levels of the session before that, touch only.
+    """
+    levels = session_levels(df["time"], df["high"], df["low"]) if levels is None else levels
+    high, low, close = (df[c].to_numpy(np.float64) for c in ["high", "low", "close"])
+    beyond = {"High": "above", "Low": "below"}
+    return pd.DataFrame(
+        {name: touch_flags(high, low, close, levels[name], beyond.get(name)) for name in FLAG_COLUMNS}, index=df.index
+    )
+
+
+def ema(close, span=EMA_SPAN, first=None):
+    # close.ewm(span, adjust=False); first overrides the first value, to continue a stored series
+    close = pd.Series(np.asarray(close, np.float64))
+    if first is not None and len(close):
+        close.iloc[0] = first
+    return close.ewm(span=span, adjust=False).mean().to_numpy()
+
+
+def price_features(df, first_ema=None):
+    # Yesterday High/Low/Mid and EMA_100 columns of the prices workbook
+    levels = session_levels(df["time"], df["high"], df["low"])
+    return pd.DataFrame({
+        "Yesterday High": levels["High"],
+        "Yesterday Low": levels["Low"],
+        "Yesterday Mid": levels["Mid"],
+        "EMA_100": ema(df["close"], first=first_ema),
+    }, index=df.index)
+
+
+def derive_bars(df):
+    """Bar file frame with its flag columns recomputed; returns (frame, rows with both sessions)."""
+    df = df.sort_values("time", kind="stable").reset_index(drop=True)
+    levels = session_levels(df["time"], df["high"], df["low"])
+    flags = level_flags(df, levels)
+    known = pd.DataFrame({name: ~np.isnan(levels[name]) for name in FLAG_COLUMNS}, index=df.index)
+    out = df[BAR_COLUMNS].copy()
+    for name in FLAG_COLUMNS:
+        out[name] = flags[name].where(known[name], df[name]) if name in df.columns else flags[name]
+    return out, known
+
+
+def derive_prices(df):
+    """Prices frame with its level and EMA columns recomputed; returns (frame, rows with a session before).
+
+    The EMA continues from the stored first value, which holds the history before the file.
+    """
+    df = df.sort_values("time", kind="stable").reset_index(drop=True)
+    stored = df["EMA_100"].iloc[0] if "EMA_100" in df.columns and len(df) else None
+    features = price_features(df, None if pd.isna(stored) else stored)
+    known = features.notna()
+    out = df[BAR_COLUMNS].copy()
+    for name in features.columns:
+        out[name] = features[name].where(known[name], df[name]) if name in df.columns else features[name]
+    return out, known
+
+
+def agreement(derived, stored, columns, rows=None):
+    # name -> share of rows where the derived and stored columns agree (numbers to 1e-6)
+    out = {}
+    for name in columns:
+        if name not in stored.columns:
+            continue
+        a, b = derived[name], stored[name]
+        same = np.isclose(a.to_numpy(np.float64), b.to_numpy(np.float64), atol=1e-6) if a.dtype.kind == "f" else (a == b).to_numpy()
+        keep = np.ones(len(same), bool) if rows is None else rows[name].to_numpy()
+        out[name] = (int(same[keep].sum()), int(keep.sum()))
+    return out
+
+
+def _write_csv(df, path):
+    tmp = path + ".tmp"
+    df.assign(time=df["time"].map(pd.Timestamp.isoformat)).to_csv(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def main(argv=None):
+    from pipeline import BARS_30_FILE, DEFAULT_SYMBOL, PRICES_FILE, symbol_path
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--write", action="store_true", help="replace the stored columns with the derived ones")
+    args = parser.parse_args(argv)
+
+    bars_path = symbol_path(BARS_30_FILE, args.symbol, args.data_dir)
+    prices_path = symbol_path(PRICES_FILE, args.symbol, args.data_dir)
+    if os.path.exists(bars_path):
+        stored = pd.read_csv(bars_path, parse_dates=["time"])
+        start = time.perf_counter()
+        derived, known = derive_bars(stored)
+        print(f"{bars_path}: {len(derived)} bars derived in {time.perf_counter() - start:.3f}s")
+        stored = stored.sort_values("time", kind="stable").reset_index(drop=True)
+        for name, (same, total) in agreement(derived, stored, FLAG_COLUMNS, known).items():
+            print(f"  {name:<15} {same}/{total} rows agree ({same / max(total, 1):.2%})")
+        if args.write:
+            _write_csv(derived, bars_path)
+            print(f"  wrote {bars_path}")
+    if os.path.exists(prices_path):
+        stored = pd.read_excel(prices_path, parse_dates=["time"])
+        start = time.perf_counter()
+        derived, known = derive_prices(stored)
+        print(f"{prices_path}: {len(derived)} bars derived in {time.perf_counter() - start:.3f}s")
+        stored = stored.sort_values("time", kind="stable").reset_index(drop=True)
+        for name, (same, total) in agreement(derived, stored, PRICE_LEVEL_COLUMNS + ["EMA_100"], known).items():
+            print(f"  {name:<15} {same}/{total} rows agree ({same / max(total, 1):.2%})")
+        if args.write:
+            tmp = prices_path + ".tmp.xlsx"
+            derived.assign(time=derived["time"].map(pd.Timestamp.isoformat)).to_excel(tmp, index=False)
+            os.replace(tmp, prices_path)
+            print(f"  wrote {prices_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ingest.py
+"""Fold the day's new rows into the stored dataset.
+
+    python ingest.py [--data-dir DIR] [--symbol NIFTY BANKNIFTY ...]
+
+Run after appending new trading days to the bar files and the summary workbook.
+Sources that only grew at the end have just their new rows parsed and stored as a
+Parquet part; anything else is rebuilt. A running app picks the parts up on its next rerun.
+The summary and rules workbooks also get a Parquet snapshot next to them when they changed;
+commit the snapshots with the data so a fresh deployment renders the summary filters without
+parsing Excel.
+"""
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from datastore import cached_read, read_snapshot, snapshot_path, sync, write_snapshot
+from pipeline import PRICES_SOURCE, RULES_FILE, SOURCES, SUMMARY_FILE, continue_ema, list_symbols, read_source, symbol_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--symbol", nargs="+", help="default: every symbol found")
+    args = parser.parse_args(argv)
+
+    sources = [(f, timeframe, reader, None, kw) for f, timeframe, reader, kw in SOURCES.values()]
+    f, timeframe, reader, kw = PRICES_SOURCE
+    sources.append((f, timeframe, reader, continue_ema, kw))
+    for symbol in args.symbol or list_symbols(args.data_dir):
+        for f, timeframe, reader, prepare, kw in sources:
+            path = symbol_path(f, symbol, args.data_dir)
+            if not os.path.exists(path):
+                print(f"{symbol} {timeframe}: {path} missing, skipped")
+                continue
+            start = time.perf_counter()
+            status, rows = sync(path, reader, prepare, (symbol, timeframe), **kw)
+            count = "" if rows is None else f" {len(rows)} rows"
+            print(f"{symbol} {timeframe}: {status}{count} ({time.perf_counter() - start:.2f}s)")
+        path = symbol_path(SUMMARY_FILE, symbol, args.data_dir)
+        if os.path.exists(path) and read_snapshot(path) is None:
+            write_snapshot(path, read_source("summary", symbol, args.data_dir))
+            print(f"{symbol} snapshot: wrote {snapshot_path(path)}")
+    rules = os.path.join(args.data_dir, RULES_FILE)
+    if os.path.exists(rules) and read_snapshot(rules) is None:
+        write_snapshot(rules, cached_read(rules, pd.read_excel))
+        print(f"rules snapshot: wrote {snapshot_path(rules)}")
+
+if __name__ == "__main__":
+    main()
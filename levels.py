@@ -0,0 +1,101 @@
+# levels.py
+import numpy as np
+import pandas as pd
+
+from engine import LAST_CANDLE, SESSION_OPEN, hhmm
+
+FLAG_LEVELS = ["High", "Mid", "Low"]
+UNTOUCHED_LEVELS = ["Untouched High", "Untouched Mid", "Untouched Low"]
+LEVELS = FLAG_LEVELS + UNTOUCHED_LEVELS
+LEVEL_RESULTS = ["No Touch", "Touch & Close Above", "Touch & Close Below"]
+MAX_CANDLES = 32
+
+
+def encode_levels(df):
+    # Level flag strings -> fixed Categorical (codes follow LEVEL_RESULTS, -1 for blanks)
+    for level in LEVELS:
+        if level in df.columns:
+            df[level] = pd.Categorical(df[level], categories=LEVEL_RESULTS)
+    return df
+
+
+def _level_tables(df_30, idx_30, day_from=0):
+    # first/mask rows for the days from ordinal day_from to the end of the frame
+    starts, ends = idx_30.starts[day_from:], idx_30.ends[day_from:]
+    n = len(starts)
+    row0 = int(starts[0]) if n else len(df_30)
+    shape = (n, len(LEVELS), len(LEVEL_RESULTS))
+    first_all = np.zeros(shape, dtype=np.int16)
+    mask_all = np.zeros(shape, dtype=np.uint32)
+
+    minute = df_30["minute"].to_numpy()[row0:]
+    day = np.repeat(np.arange(n), ends - starts)
+    col = np.arange(len(day)) - (starts - row0)[day]
+    in_window = (minute >= SESSION_OPEN) & (minute <= LAST_CANDLE)
+    for li, level in enumerate(LEVELS):
+        if level not in df_30.columns:
+            continue
+        codes = df_30[level].cat.codes.to_numpy()[row0:]
+        hit = (codes >= 0) & (col < MAX_CANDLES)
+        np.bitwise_or.at(mask_all[:, li], (day[hit], codes[hit]), np.uint32(1) << col[hit].astype(np.uint32))
+        hit = (codes >= 0) & in_window
+        first = np.full((n, len(LEVEL_RESULTS)), np.iinfo(np.int16).max, dtype=np.int16)
+        np.minimum.at(first, (day[hit], codes[hit]), col[hit].astype(np.int16) + 1)
+        first_all[:, li] = np.where(first == np.iinfo(np.int16).max, 0, first)
+    return first_all, mask_all
+
+
+class LevelEvents:
+    """First candle per (day, level, result), built once from the 30-min frame.
+
+    first holds the 1-based candle number of the first match between 09:15 and 15:15
+    (0 when none); mask has bit n-1 set when candle n matches, so any candle-number set
+    is answered without going back to the bars.
+    """
+
+    def __init__(self, df_30, idx_30):
+        self.idx = idx_30
+        self.minute = df_30["minute"].to_numpy()
+        self.first, self.mask = _level_tables(df_30, idx_30)
+
+    def extended(self, df_30, idx_30, day_from):
+        # Table for a grown frame, recomputing only days from ordinal day_from onwards
+        out = LevelEvents.__new__(LevelEvents)
+        out.idx = idx_30
+        out.minute = df_30["minute"].to_numpy()
+        first, mask = _level_tables(df_30, idx_30, day_from)
+        out.first = np.concatenate([self.first[:day_from], first])
+        out.mask = np.concatenate([self.mask[:day_from], mask])
+        return out
+
+    def first_candle(self, keys, level, result, candle_nums=None):
+        # 0-based day column of the first matching candle per key (-1 when none) and the table rows
+        pos, present = self.idx.positions(keys)
+        li, ri = LEVELS.index(level), LEVEL_RESULTS.index(result)
+        if candle_nums is None:
+            col = self.first[pos, li, ri].astype(np.int64) - 1
+        else:
+            bits = self.mask[pos, li, ri]
+            col = np.full(len(keys), -1, dtype=np.int64)
+            # Walk the chosen order backwards so the earliest listed candle wins
+            for num in reversed([n for n in candle_nums if 1 <= n <= MAX_CANDLES]):
+                col = np.where((bits >> np.uint32(num - 1)) & 1, num - 1, col)
+        return np.where(present, col, -1), pos
+
+    def match(self, keys, levels, result, candle_nums=None):
+        """Days where every level in levels shows result, indexed by day_key with candle_info."""
+        keys = np.unique(np.asarray(keys, dtype=np.int64))
+        if not len(self.idx):
+            keys = keys[:0]
+        ok = np.ones(len(keys), dtype=bool)
+        parts = []
+        for level in levels:
+            col, pos = self.first_candle(keys, level, result, candle_nums)
+            ok &= col >= 0
+            minute = self.minute[self.idx.starts[pos] + col.clip(min=0)]
+            parts.append((level, col, minute))
+        info = []
+        for i in np.flatnonzero(ok):
+            labels = [f"#{col[i] + 1} ({hhmm(int(minute[i]))})" for _, col, minute in parts]
+            info.append(labels[0] if len(parts) == 1 else ", ".join(f"{lv} {lb}" for (lv, _, _), lb in zip(parts, labels)))
+        return pd.DataFrame({"candle_info": info}, index=pd.Index(keys[ok], name="day_key"))
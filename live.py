@@ -0,0 +1,308 @@
+# live.py
+"""Live intraday evaluation of the confirmation conditions as bars close.
+
+    python live.py --feed NIFTY_5min_live.csv [--symbol NIFTY] [--beyond-1010]
+    python live.py --socket 127.0.0.1:9009
+
+The feed is 5-min bars in the NIFTY_5min_All_Sorted.csv layout (time,open,high,low,close),
+appended as they close, either to a CSV that is tailed from its last offset or as lines on
+a local TCP socket. 30-min bars are built from it, session-aligned from 09:15. Each
+condition keeps a few values per day (first 30-min range, match, last close), so a bar
+costs the same however much history exists.
+"""
+import argparse
+import io
+import os
+import socket
+import threading
+import time
+
+import pandas as pd
+
+from engine import (
+    FIVE_MIN_LOGIC, LAST_CANDLE, SESSION_END, SESSION_OPEN, THIRTY_MIN_LOGIC, day_keys, hhmm, minute_of_day, session_bucket,
+    window_end_5,
+)
+from levels import FLAG_LEVELS, LEVEL_RESULTS
+
+LIVE_FEED_FILE = "NIFTY_5min_live.csv"
+NO_TOUCH, ABOVE, BELOW = LEVEL_RESULTS
+
+
+def _parse(data):
+    # CSV bytes with a header -> bars with day_key and minute-of-day
+    df = pd.read_csv(io.BytesIO(data), parse_dates=["time"])
+    df["day_key"] = day_keys(df["time"])
+    df["minute"] = minute_of_day(df["time"])
+    return df
+
+
+class CsvFeed:
+    """Tails an appended CSV: poll() parses only the complete lines written since the last call."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.header = b""
+
+    def poll(self):
+        if not os.path.exists(self.path):
+            return None
+        if os.path.getsize(self.path) < self.offset:
+            self.offset, self.header = 0, b""  # truncated or replaced: start over
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1  # leave a partly written last line for the next poll
+        if not end:
+            return None
+        data, self.offset = data[:end], self.offset + end
+        if not self.header:
+            head, _, data = data.partition(b"\n")
+            self.header = head + b"\n"
+        return _parse(self.header + data) if data.strip() else None
+
+
+class SocketFeed:
+    """Same as CsvFeed for newline-delimited CSV (header first) on a local TCP socket."""
+
+    def __init__(self, host, port):
+        self.sock = socket.create_connection((host, port))
+        self.sock.setblocking(False)
+        self.buffer = b""
+        self.header = b""
+
+    def poll(self):
+        try:
+            while True:
+                chunk = self.sock.recv(1 << 16)
+                if not chunk:
+                    break
+                self.buffer += chunk
+        except BlockingIOError:
+            pass
+        end = self.buffer.rfind(b"\n") + 1
+        if not end:
+            return None
+        data, self.buffer = self.buffer[:end], self.buffer[end:]
+        if not self.header:
+            head, _, data = data.partition(b"\n")
+            self.header = head + b"\n"
+        return _parse(self.header + data) if data.strip() else None
+
+
+class Match:
+    """Incremental state of one condition for the current day."""
+
+    def __init__(self, name, timeframe):
+        self.name, self.timeframe = name, timeframe
+        self.candle = self.minute = self.close = self.last_close = None
+        self.failed = self.closed = False
+
+    def hit(self, candle, minute, close):
+        if self.candle is None and not self.failed:
+            self.candle, self.minute, self.close = candle, minute, close
+
+    def status(self):
+        if self.failed:
+            return "no match"
+        if self.candle is not None:
+            return "matched" if self.closed or self.name != "No Breakout (Neither)" else "holding"
+        return "no match" if self.closed else "waiting"
+
+    def row(self):
+        row = {"timeframe": self.timeframe, "condition": self.name, "status": self.status(), "candle": None, "time": None, "move": None}
+        if self.candle is not None and not self.failed:
+            row.update(candle=self.candle, time=hhmm(self.minute), move=round(self.last_close - self.close, 2))
+        return row
+
+
+class LiveDay:
+    """Conditions of one session, updated per closed 5-min / 30-min bar.
+
+    Mirrors engine.confirm_5min / confirm_30min with Auto candles: 5-min closes from 09:45
+    to 10:10 (15:30 with beyond_1010) against the first 30-min range, and 30-min candles
+    from 09:15 to 15:15 against the first 30-min candle. No Breakout holds until its
+    window closes. prev_levels is the previous session's (high, low, mid) for the level flags.
+    """
+
+    def __init__(self, day_key, prev_levels=None, beyond_1010=False):
+        self.day_key = day_key
+        self.window_end = window_end_5(30, beyond_1010)
+        self.range_30 = None  # (high, low) of the first 30-min candle
+        self.n_5 = self.n_30 = 0
+        self.high = self.low = None
+        self.m5 = [Match(logic, "5-min") for logic in FIVE_MIN_LOGIC]
+        self.m30 = [Match(logic, "30-min") for logic in THIRTY_MIN_LOGIC]
+        self.levels = dict(zip(FLAG_LEVELS, (prev_levels[0], prev_levels[2], prev_levels[1]))) if prev_levels else {}
+        self.flags = {}
+        self.first_flag = {}
+
+    def on_bar_5(self, minute, o, h, l, c):
+        self.high = h if self.high is None else max(self.high, h)
+        self.low = l if self.low is None else min(self.low, l)
+        # Moves run to the latest close; at the session end that is the day's last close, as in the engine
+        for m in self.m5 + self.m30:
+            m.last_close = c
+        if minute > self.window_end:
+            for m in self.m5:
+                m.closed = True
+            return
+        if minute < SESSION_OPEN + 30 or self.range_30 is None:
+            return
+        self.n_5 += 1
+        high, low = self.range_30
+        above, below = self.m5[0], self.m5[1]
+        if c > high:
+            above.hit(self.n_5, minute, c)
+        if c < low:
+            below.hit(self.n_5, minute, c)
+        neither = self.m5[2]
+        if low <= c <= high:
+            neither.hit(self.n_5, minute, c)
+        else:
+            neither.failed = True
+        if minute >= min(self.window_end, SESSION_END - 5):
+            for m in self.m5:
+                m.closed = True
+
+    def on_bar_30(self, minute, o, h, l, c):
+        self.n_30 += 1
+        if self.range_30 is None:
+            self.range_30 = (h, l)
+        if SESSION_OPEN <= minute <= LAST_CANDLE:
+            high, low = self.range_30
+            above, below, neither, above_below, below_above = self.m30
+            if c > high:
+                above.hit(self.n_30, minute, c)
+            if c < low:
+                below.hit(self.n_30, minute, c)
+            if low <= c <= high:
+                neither.hit(self.n_30, minute, c)
+            else:
+                neither.failed = True
+            if h > high and c < high:
+                above_below.hit(self.n_30, minute, c)
+            if l < low and c > low:
+                below_above.hit(self.n_30, minute, c)
+            self._flag(minute, h, l, c)
+        if minute >= LAST_CANDLE:
+            for m in self.m30:
+                m.closed = True
+
+    def _flag(self, minute, h, l, c):
+        # Previous-session level flags of this candle, and the first candle per (level, result)
+        for level, price in self.levels.items():
+            if l <= price <= h:
+                flag = ABOVE if c > price else BELOW
+            elif level == "High" and l > price:
+                flag = ABOVE
+            elif level == "Low" and h < price:
+                flag = BELOW
+            else:
+                flag = NO_TOUCH
+            self.flags[level] = flag
+            self.first_flag.setdefault((level, flag), (self.n_30, minute))
+
+    def conditions(self):
+        return pd.DataFrame([m.row() for m in self.m5 + self.m30])
+
+    def level_table(self):
+        rows = []
+        for level, price in self.levels.items():
+            row = {"level": level, "price": round(price, 2), "current": self.flags.get(level)}
+            for result in LEVEL_RESULTS:
+                first = self.first_flag.get((level, result))
+                row[result] = None if first is None else f"#{first[0]} ({hhmm(first[1])})"
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class LiveTracker:
+    """Feeds closed bars to the current LiveDay, rolling to a new day on the first bar of a session.
+
+    previous_levels(day_key) supplies the prior session's (high, low, mid) from history for
+    the first live day (e.g. ChartStore.previous_levels); later days use the live bars.
+    Thread-safe, so one tracker can serve every app session.
+    """
+
+    def __init__(self, feed, previous_levels=None, beyond_1010=False):
+        self.feed, self.previous_levels, self.beyond_1010 = feed, previous_levels, beyond_1010
+        self.day = None
+        self.bucket = None  # 30-min candle being built: [start minute, open, high, low, close]
+        self.bars = 0
+        self.updated = None
+        self._lock = threading.Lock()
+
+    def poll(self):
+        # Feed any newly closed bars; returns how many arrived
+        with self._lock:
+            rows = self.feed.poll()
+            if rows is None or rows.empty:
+                return 0
+            cols = [rows[c].to_numpy() for c in ["day_key", "minute", "open", "high", "low", "close"]]
+            for key, minute, o, h, l, c in zip(*cols):
+                self._on_bar(int(key), int(minute), float(o), float(h), float(l), float(c))
+            self.bars += len(rows)
+            self.updated = time.strftime("%H:%M:%S")
+            return len(rows)
+
+    def _on_bar(self, key, minute, o, h, l, c):
+        if self.day is None or key != self.day.day_key:
+            prev = None
+            if self.day is not None and self.day.high is not None:
+                prev = (self.day.high, self.day.low, (self.day.high + self.day.low) / 2)
+            elif self.previous_levels is not None:
+                prev = self.previous_levels(key)
+            self.day, self.bucket = LiveDay(key, prev, self.beyond_1010), None
+        start = session_bucket(minute, 30)
+        if self.bucket is not None and self.bucket[0] != start:
+            self.day.on_bar_30(*self.bucket)  # a bar of the next bucket closes the previous one
+            self.bucket = None
+        if self.bucket is None:
+            self.bucket = [start, o, h, l, c]
+        else:
+            self.bucket[2], self.bucket[3], self.bucket[4] = max(self.bucket[2], h), min(self.bucket[3], l), c
+        if minute + 5 >= min(start + 30, SESSION_END):
+            self.day.on_bar_30(*self.bucket)
+            self.bucket = None
+        self.day.on_bar_5(minute, o, h, l, c)
+
+    def snapshot(self):
+        with self._lock:
+            if self.day is None:
+                return None, pd.DataFrame(), pd.DataFrame()
+            return self.day.day_key, self.day.conditions(), self.day.level_table()
+
+
+def main(argv=None):
+    from charts import ChartStore
+    from pipeline import DEFAULT_SYMBOL, read_prices, symbol_path
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbol", default=DEFAULT_SYMBOL)
+    parser.add_argument("--feed", help=f"CSV to tail (default: {LIVE_FEED_FILE} for the symbol)")
+    parser.add_argument("--socket", help="host:port of a local bar feed")
+    parser.add_argument("--beyond-1010", action="store_true")
+    parser.add_argument("--interval", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    if args.socket:
+        host, port = args.socket.rsplit(":", 1)
+        feed = SocketFeed(host, int(port))
+    else:
+        feed = CsvFeed(args.feed or symbol_path(LIVE_FEED_FILE, args.symbol))
+    tracker = LiveTracker(feed, ChartStore(read_prices(args.symbol)).previous_levels, args.beyond_1010)
+    last = None
+    while True:
+        if tracker.poll():
+            day, conditions, levels = tracker.snapshot()
+            text = conditions.to_string(index=False) + "\n\n" + levels.to_string(index=False)
+            if text != last:
+                print(f"--- {day} ({tracker.updated}, {tracker.bars} bars)\n{text}\n", flush=True)
+                last = text
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    main()
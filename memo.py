@@ -0,0 +1,87 @@
+# memo.py
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def day_set_key(keys):
+    # Order-insensitive fingerprint of a set of day keys
+    keys = np.unique(np.asarray(keys, dtype=np.int64))
+    return hashlib.blake2b(keys.tobytes(), digest_size=16).hexdigest()
+
+
+def sizeof(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class StageCache:
+    """Thread-safe LRU of filter-stage results, bounded by entry count and estimated bytes."""
+
+    def __init__(self, max_entries=512, max_bytes=256 << 20):
+        self.max_entries, self.max_bytes = max_entries, max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.bytes = 0
+        self.version = None
+
+    def get_or_compute(self, stage, keys, compute):
+        # stage is a hashable (name, *params) tuple; keys the input day set (None when the stage has none)
+        key = (stage, None if keys is None else day_set_key(keys))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+        value = compute()
+        size = sizeof(value)
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (value, size)
+                self.bytes += size
+                while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                    _, (_, dropped) = self._entries.popitem(last=False)
+                    self.bytes -= dropped
+                    self.evictions += 1
+        return value
+
+    def set_version(self, version):
+        # Entries belong to one dataset version; a new version drops them
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.bytes = 0
+                self.version = version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+def memoized(cache, stage, keys, compute):
+    return compute() if cache is None else cache.get_or_compute(stage, keys, compute)
@@ -0,0 +1,524 @@
+# pipeline.py
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+
+import numpy as np
+import pandas as pd
+
+from confidence import split_intervals
+from datastore import cached_read, read_snapshot, source_signature, sync
+from engine import DayIndex, confirm_30min, confirm_5min, day_keys, minute_of_day, session_bucket
+from levels import LevelEvents, encode_levels
+from memo import memoized
+
+SUMMARY_FILE = "Daily_Summary_with_Prioritized_Signal.xlsx"
+BARS_30_FILE = "NSE_NIFTY, 30.csv"
+BARS_5_FILE = "NIFTY_5min_All_Sorted.csv"
+RULES_FILE = "Signals.xlsx"
+PRICES_FILE = "NSE_NIFTY, 30 Prices.xlsx"
+
+# NIFTY's files sit in the data root; every other symbol has a SYMBOLS_DIR/<symbol>/ folder with the
+# same files, NIFTY in their names replaced by the symbol (NSE_BANKNIFTY, 30.csv, ...)
+DEFAULT_SYMBOL = "NIFTY"
+SYMBOLS_DIR = os.environ.get("SIGNALS_SYMBOLS_DIR", "symbols")
+
+MOVE_MAP = {
+    "Very Strong Long": "Very Strong Long (>= 1.00%)",
+    "Moderate Long": "Moderate Long (0.40% to 1.00%)",
+    "Long Sideways": "Long Sideways (0% to +0.40%)",
+    "Short Sideways": "Short Sideways (0% to -0.40%)",
+    "Moderate Short": "Moderate Short (-0.40% to -1.00%)",
+    "Very Strong Short": "Very Strong Short (<= -1.00%)",
+    "None": "None (0%)"
+}
+
+# OHLC is kept as float32 when SIGNALS_FLOAT32=1: half the bar memory, ~0.002 pt resolution at NIFTY levels
+FLOAT32_PRICES = os.environ.get("SIGNALS_FLOAT32", "") not in ("", "0")
+PRICE_COLUMNS = ["open", "high", "low", "close"]
+# Summary label columns, kept as categoricals: a few dozen distinct strings over every day
+SUMMARY_LABELS = ["Signal", "Candles", "Prev_Move"]
+
+# Confirmation timeframes (minutes) cut from the 5-min bars in session-aligned buckets from the 09:15 open
+TIMEFRAMES = [15, 30, 45, 60, 75, 125]
+RANGE_TIMEFRAMES = [15, 30, 45, 60]
+
+# Loaded once per process and shared by every session; stages only read the bar frames and
+# the filtered summary they return is a copy
+Dataset = namedtuple("Dataset", ["summary", "df_30", "df_5", "idx_30", "idx_5", "levels", "timeframes"])
+
+
+# Categorize Prev_Move with new Sideways split
+def categorize_prev_move(move):
+    if move >= 1.0:
+        return "Very Strong Long"
+    elif 0.4 < move < 1.0:
+        return "Moderate Long"
+    elif 0 < move <= 0.4:
+        return "Long Sideways"
+    elif -0.4 <= move < 0:
+        return "Short Sideways"
+    elif -1.0 < move < -0.4:
+        return "Moderate Short"
+    elif move <= -1.0:
+        return "Very Strong Short"
+    elif move == 0:
+        return "None"
+    else:
+        return "Other"
+
+
+def categorize_labels(summary):
+    # Label columns -> Categorical; again after a concat, which falls back to object when the categories differ
+    for col in SUMMARY_LABELS:
+        summary[col] = summary[col].astype("category")
+    return summary
+
+
+def prepare_summary(summary):
+    # Days are the Date column (datetime64) and its yyyymmdd day_key; no per-row date objects are kept
+    summary.columns = summary.columns.str.strip()
+    summary["Date"] = pd.to_datetime(summary["Date"], dayfirst=True)
+    summary["day_key"] = day_keys(summary["Date"]).astype(np.int32)
+    if "Prev_Move" not in summary.columns or summary["Prev_Move"].isnull().all():
+        summary["Prev_Move"] = summary["Move"].map(categorize_prev_move)
+    return categorize_labels(summary)
+
+
+def prepare_bars(df, levels=False, float32=None):
+    # Bars sorted by time so each day is one contiguous row range in the offset index. Days and
+    # session times are narrow ints (yyyymmdd, minute of day): filters compare integers and no
+    # per-row date/time objects are kept.
+    df = df.sort_values("time", kind="stable").reset_index(drop=True)
+    df["day_key"] = day_keys(df["time"]).astype(np.int32)
+    df["minute"] = minute_of_day(df["time"]).astype(np.int16)
+    if FLOAT32_PRICES if float32 is None else float32:
+        df[PRICE_COLUMNS] = df[PRICE_COLUMNS].astype(np.float32)
+    return encode_levels(df) if levels else df
+
+
+def resample_bars(df_5, minutes):
+    """Bars of a timeframe from prepared 5-min bars, bucketed from the 09:15 open.
+
+    Each (day, bucket) is one run of the sorted 5-min rows, so OHLC is a reduceat over the
+    runs. A session's last bucket is cut short at the close (15:15-15:30 for 30-min).
+    """
+    if minutes % 5:
+        raise ValueError(f"Timeframe must be a multiple of 5 minutes: {minutes}")
+    if df_5.empty:
+        return df_5.copy()
+    day = df_5["day_key"].to_numpy(np.int64)
+    minute = df_5["minute"].to_numpy(np.int64)
+    bucket = session_bucket(minute, minutes)
+    starts = np.flatnonzero(np.r_[True, (day[1:] != day[:-1]) | (bucket[1:] != bucket[:-1])])
+    ends = np.append(starts[1:], len(day))
+    bars = df_5.iloc[starts][["time", "open"]].reset_index(drop=True)
+    bars["time"] += pd.to_timedelta(bucket[starts] - minute[starts], unit="min")
+    bars["high"] = np.maximum.reduceat(df_5["high"].to_numpy(), starts)
+    bars["low"] = np.minimum.reduceat(df_5["low"].to_numpy(), starts)
+    bars["close"] = df_5["close"].to_numpy()[ends - 1]
+    bars["day_key"] = day[starts].astype(np.int32)
+    bars["minute"] = bucket[starts].astype(np.int16)
+    return bars
+
+
+class Timeframes:
+    """Confirmation bars per timeframe: minutes -> (bars, DayIndex).
+
+    30 is the stored 30-min file; any other timeframe is resampled from the 5-min bars on
+    first use and kept for the life of the dataset, shared by every session like the rest of it.
+    """
+
+    def __init__(self, df_5, df_30, idx_30):
+        self.df_5 = df_5
+        self._frames = {30: (df_30, idx_30)}
+        self._lock = threading.Lock()
+
+    def get(self, minutes):
+        with self._lock:
+            if minutes not in self._frames:
+                bars = resample_bars(self.df_5, minutes)
+                self._frames[minutes] = (bars, DayIndex(bars["day_key"]))
+            return self._frames[minutes]
+
+
+def continue_ema(prices, last, span=100):
+    # Fill EMA_100 from its first gap onwards, continuing from the previous row (stored row when appending)
+    if "EMA_100" not in prices.columns:
+        prices["EMA_100"] = float("nan")
+    missing = prices["EMA_100"].isna().to_numpy()
+    if not missing.any():
+        return prices
+    first = int(missing.argmax())
+    seed = prices["EMA_100"].iloc[first - 1] if first else (last or {}).get("EMA_100")
+    closes = prices["close"].iloc[first:].astype(float)
+    if seed is not None:
+        closes = pd.concat([pd.Series([seed]), closes], ignore_index=True)
+    ema = closes.ewm(span=span, adjust=False).mean().to_numpy()
+    prices.loc[prices.index[first:], "EMA_100"] = ema[-(len(prices) - first):]
+    return prices
+
+
+# name -> (file, timeframe, reader, reader options); stores are partitioned by (symbol, timeframe)
+SOURCES = {
+    "summary": (SUMMARY_FILE, "1d", pd.read_excel, {}),
+    "df_30": (BARS_30_FILE, "30m", pd.read_csv, {"parse_dates": ["time"]}),
+    "df_5": (BARS_5_FILE, "5m", pd.read_csv, {"parse_dates": ["time"]}),
+}
+PRICES_SOURCE = (PRICES_FILE, "30m_prices", pd.read_excel, {"parse_dates": ["time"]})
+
+
+def symbol_path(f, symbol=DEFAULT_SYMBOL, root="."):
+    if symbol == DEFAULT_SYMBOL:
+        return os.path.join(root, f)
+    return os.path.join(root, SYMBOLS_DIR, symbol, f.replace(DEFAULT_SYMBOL, symbol))
+
+
+def list_symbols(root="."):
+    # Symbols with a summary workbook; a directory listing, nothing is read
+    symbols = [DEFAULT_SYMBOL] if os.path.exists(symbol_path(SUMMARY_FILE, DEFAULT_SYMBOL, root)) else []
+    base = os.path.join(root, SYMBOLS_DIR)
+    if os.path.isdir(base):
+        symbols += sorted(
+            s for s in os.listdir(base) if s != DEFAULT_SYMBOL and os.path.exists(symbol_path(SUMMARY_FILE, s, root))
+        )
+    return symbols
+
+
+def read_source(name, symbol=DEFAULT_SYMBOL, root="."):
+    f, timeframe, reader, kw = SOURCES[name]
+    return cached_read(symbol_path(f, symbol, root), reader, partition=(symbol, timeframe), **kw)
+
+
+def sync_source(name, symbol=DEFAULT_SYMBOL, root="."):
+    f, timeframe, reader, kw = SOURCES[name]
+    return sync(symbol_path(f, symbol, root), reader, partition=(symbol, timeframe), **kw)
+
+
+def read_prices(symbol=DEFAULT_SYMBOL, root="."):
+    f, timeframe, reader, kw = PRICES_SOURCE
+    return cached_read(symbol_path(f, symbol, root), reader, continue_ema, (symbol, timeframe), **kw)
+
+
+def read_summary(symbol=DEFAULT_SYMBOL, root="."):
+    # Prepared summary without going through the stores: the committed snapshot while it matches
+    # the workbook (ingest.py writes it), else the workbook itself
+    path = symbol_path(SUMMARY_FILE, symbol, root)
+    raw = read_snapshot(path)
+    return prepare_summary(pd.read_excel(path) if raw is None else raw)
+
+
+def build_dataset(summary, df_30, df_5):
+    idx_30 = DayIndex(df_30["day_key"])
+    return Dataset(
+        summary, df_30, df_5, idx_30, DayIndex(df_5["day_key"]), LevelEvents(df_30, idx_30), Timeframes(df_5, df_30, idx_30)
+    )
+
+
+def load_dataset(root=".", symbol=DEFAULT_SYMBOL):
+    frames = {name: read_source(name, symbol, root) for name in SOURCES}
+    return build_dataset(
+        prepare_summary(frames["summary"]),
+        prepare_bars(frames["df_30"], levels=True),
+        prepare_bars(frames["df_5"]),
+    )
+
+
+def _after(rows, stored):
+    if rows is None or not len(rows):
+        return stored.iloc[:0]
+    return rows[rows["time"] > stored["time"].iloc[-1]] if len(stored) else rows
+
+
+def extend_dataset(data, summary=None, df_30=None, df_5=None):
+    """Dataset with appended raw rows; only the new rows, their day index entries and the
+    level table rows of the days they touch are derived. Resampled timeframes are cut again
+    on their next use."""
+    new_summary, new_30, new_5 = data.summary, data.df_30, data.df_5
+    idx_30, idx_5, levels = data.idx_30, data.idx_5, data.levels
+    if summary is not None and len(summary):
+        new_summary = categorize_labels(pd.concat([data.summary, prepare_summary(summary)], ignore_index=True))
+    # Bars are append-only in time; anything not after the stored bars is ignored
+    df_5 = _after(df_5, data.df_5)
+    if len(df_5):
+        df_5 = prepare_bars(df_5)
+        new_5 = pd.concat([data.df_5, df_5], ignore_index=True)
+        idx_5 = data.idx_5.extended(df_5["day_key"], len(data.df_5))
+    df_30 = _after(df_30, data.df_30)
+    if len(df_30):
+        df_30 = prepare_bars(df_30, levels=True)
+        new_30 = pd.concat([data.df_30, df_30], ignore_index=True)
+        idx_30 = data.idx_30.extended(df_30["day_key"], len(data.df_30))
+        day_from, _ = idx_30.positions(df_30["day_key"].iloc[:1])
+        levels = data.levels.extended(new_30, idx_30, int(day_from[0]))
+    return Dataset(new_summary, new_30, new_5, idx_30, idx_5, levels, Timeframes(new_5, new_30, idx_30))
+
+
+class DatasetHolder:
+    """Process-wide dataset of one symbol that follows its source files: nothing is read
+    until the first get(), appended rows are folded in with extend_dataset, a rewritten
+    summary is prepared again on its own and a rewritten bar file reloads everything.
+    version increases on every change.
+
+    warm(pool) starts the first load and the prices store on a thread pool instead; until
+    the load is done summary() reads only the summary, and get() waits for it.
+    """
+
+    def __init__(self, root=".", symbol=DEFAULT_SYMBOL):
+        self.root, self.symbol = root, symbol
+        self.data = None
+        self.version = 0
+        self._lock = threading.Lock()
+        self._warming = None
+        self._warm_lock = threading.Lock()
+        self._summary = None  # (workbook signature, prepared summary) served while the bars load
+
+    def warm(self, pool):
+        # Background loads, once: "bars" the dataset, "prices" the chart prices store
+        with self._warm_lock:
+            if self._warming is None:
+                self._warming = {
+                    "bars": pool.submit(self.get),
+                    "prices": pool.submit(read_prices, self.symbol, self.root),
+                }
+        return self.pending()
+
+    def pending(self):
+        # Warm-up loads still running; a failed one counts as done and fails again where it is used
+        return [name for name, future in (self._warming or {}).items() if not future.done()]
+
+    def summary(self):
+        # Without waiting for a load in progress; read once per workbook version, not on every rerun
+        data = self.data
+        if data is not None:
+            return data.summary
+        signature = source_signature(symbol_path(SUMMARY_FILE, self.symbol, self.root))
+        cached = self._summary
+        if cached is None or cached[0] != signature:
+            cached = self._summary = (signature, read_summary(self.symbol, self.root))
+        return cached[1]
+
+    def get(self):
+        with self._lock:
+            if self.data is None:
+                self.data = load_dataset(self.root, self.symbol)
+                self.version += 1
+                return self.data, self.version
+            synced = {name: sync_source(name, self.symbol, self.root) for name in SOURCES}
+            if "rebuilt" in (synced["df_30"][0], synced["df_5"][0]):
+                self.data = load_dataset(self.root, self.symbol)
+                self.version += 1
+                return self.data, self.version
+            # Bars only grew: a rewritten summary (its placeholder row is filled in every day) is
+            # prepared again on its own, appended rows of any source are folded in
+            data = self.data
+            if synced["summary"][0] == "rebuilt":
+                data = data._replace(summary=prepare_summary(synced["summary"][1]))
+            appended = {name: rows for name, (status, rows) in synced.items() if status == "appended"}
+            if appended:
+                data = extend_dataset(data, **appended)
+            if data is not self.data:
+                self.data = data
+                self.version += 1
+            return self.data, self.version
+
+
+@dataclass(frozen=True)
+class FilterSpec:
+    """One setup of the analyzer filters; None/() leaves a stage off, None candle numbers mean Auto.
+
+    range_5 is the timeframe of the first-candle range the 5-min closes are tested against and
+    timeframe_30 the bars of the 30-min conditions, both in minutes (see Timeframes). The 5-min
+    window runs 25 minutes from the range candle's close (09:45-10:10 for 30, 10:15-10:40 for
+    60), or to the session end with beyond_1010.
+    """
+    signal: str = "Any"
+    candles: str = "Any"
+    prev_move: str = "Any"
+    logic_5: str = None
+    beyond_1010: bool = False
+    range_5: int = 30
+    logic_30: str = None
+    timeframe_30: int = 30
+    candles_30: tuple = None
+    flag_levels: tuple = ()
+    flag_result: str = "Any"
+    flag_candles: tuple = None
+    untouched_levels: tuple = ()
+    untouched_result: str = "Any"
+    untouched_candles: tuple = None
+
+    def normalized(self):
+        # Settings of a disabled stage do not change the result; reset them so equal setups compare equal
+        changes = {}
+        if not self.logic_5:
+            changes.update(logic_5=None, beyond_1010=False, range_5=30)
+        if not self.logic_30:
+            changes.update(logic_30=None, timeframe_30=30, candles_30=None)
+        if not self.flag_levels or self.flag_result == "Any":
+            changes.update(flag_levels=(), flag_result="Any", flag_candles=None)
+        if not self.untouched_levels or self.untouched_result == "Any":
+            changes.update(untouched_levels=(), untouched_result="Any", untouched_candles=None)
+        return replace(self, **changes)
+
+    def summary_only(self):
+        # No intraday stage is on: the result is the summary filter alone (see cube.SummaryCube)
+        return self.normalized() == FilterSpec(self.signal, self.candles, self.prev_move)
+
+
+# Stages take an optional memo.StageCache; results are keyed by stage parameters and the input day set
+
+
+def filter_summary(summary, signal="Any", candles="Any", prev_move="Any", cache=None):
+    def rows():
+        mask = np.ones(len(summary), dtype=bool)
+        if signal != "Any":
+            mask &= (summary["Signal"] == signal).to_numpy()
+        if candles != "Any":
+            mask &= (summary["Candles"] == candles).to_numpy()
+        if prev_move != "Any":
+            mask &= (summary["Prev_Move"] == prev_move).to_numpy()
+        return np.flatnonzero(mask)
+    return summary.iloc[memoized(cache, ("summary", signal, candles, prev_move), None, rows)].copy()
+
+
+def apply_5min(filtered, data, logic, beyond_1010=False, cache=None, range_minutes=30):
+    keys = filtered["day_key"].unique()
+    matches, missing = memoized(cache, ("5min", logic, beyond_1010, range_minutes), keys, lambda: confirm_5min(
+        keys, data.df_5, data.idx_5, *data.timeframes.get(range_minutes), logic, beyond_1010, range_minutes
+    ))
+    if not matches.empty:
+        # 5-min candle info (number and time, relative to window)
+        filtered["5_Candle_Info"] = filtered["day_key"].map(matches["candle_info"])
+    filtered = filtered[filtered["day_key"].isin(matches.index)]
+    if not matches.empty:
+        filtered["5_Move"] = filtered["day_key"].map(matches["move"])
+    return filtered, matches, missing
+
+
+def apply_30min(filtered, data, logic, candle_nums=None, cache=None, minutes=30):
+    keys = filtered["day_key"].unique()
+    candle_nums = None if candle_nums is None else tuple(candle_nums)
+    matches, missing = memoized(cache, ("30min", logic, candle_nums, minutes), keys, lambda: confirm_30min(
+        keys, *data.timeframes.get(minutes), logic, candle_nums
+    ))
+    if not matches.empty:
+        filtered["Candle_Info"] = filtered["day_key"].map(matches["candle_info"])
+    filtered = filtered[filtered["day_key"].isin(matches.index)]
+    if not matches.empty:
+        filtered["30_Move"] = filtered["day_key"].map(matches["move"])
+    return filtered, matches, missing
+
+
+def apply_levels(filtered, data, info_col, levels, result, candle_nums=None, cache=None):
+    if not levels or result == "Any":
+        return filtered
+    keys = filtered["day_key"].unique()
+    levels, candle_nums = tuple(levels), None if candle_nums is None else tuple(candle_nums)
+    matches = memoized(cache, ("levels", levels, result, candle_nums), keys, lambda: data.levels.match(
+        keys, list(levels), result, candle_nums
+    ))
+    filtered[info_col] = filtered["day_key"].map(matches["candle_info"])
+    return filtered[filtered["day_key"].isin(matches.index)]
+
+
+def apply_filters(data, spec, cache=None):
+    filtered = filter_summary(data.summary, spec.signal, spec.candles, spec.prev_move, cache)
+    if spec.logic_5:
+        filtered, _, _ = apply_5min(filtered, data, spec.logic_5, spec.beyond_1010, cache, spec.range_5)
+    if spec.logic_30:
+        filtered, _, _ = apply_30min(filtered, data, spec.logic_30, spec.candles_30, cache, spec.timeframe_30)
+    filtered = apply_levels(filtered, data, "Flag_Candle_Info", spec.flag_levels, spec.flag_result, spec.flag_candles, cache)
+    filtered = apply_levels(
+        filtered, data, "Untouched_Candle_Info", spec.untouched_levels, spec.untouched_result, spec.untouched_candles, cache
+    )
+    return filtered
+
+
+def direction_split(labels):
+    counts = labels.value_counts()
+    longs, shorts = int(counts.get("Long", 0)), int(counts.get("Short", 0))
+    total = longs + shorts
+    long_pct = (longs / total * 100) if total else 0
+    short_pct = (shorts / total * 100) if total else 0
+    return longs, shorts, long_pct, short_pct
+
+
+def summarize(filtered):
+    longs, shorts, long_pct, short_pct = direction_split(filtered["Move.1"])
+    moves = filtered["Move"].dropna()
+    stats = {
+        "days": len(filtered),
+        "longs": longs,
+        "shorts": shorts,
+        "long_pct": round(long_pct, 2),
+        "short_pct": round(short_pct, 2),
+        "avg_long_move": moves[moves > 0].mean(),
+        "avg_short_move": moves[moves < 0].mean(),
+    }
+    if "5_Move" in filtered.columns:
+        moves5 = filtered["5_Move"].dropna()
+        labels5 = moves5.map(lambda x: "Long" if x > 0 else ("Short" if x < 0 else ""))
+        _, _, long_pct_5, short_pct_5 = direction_split(labels5)
+        stats.update({
+            "long_pct_5": round(long_pct_5, 2),
+            "short_pct_5": round(short_pct_5, 2),
+            "avg_long_5_move": moves5[moves5 > 0].mean(),
+            "avg_short_5_move": moves5[moves5 < 0].mean(),
+        })
+    if "30_Move" in filtered.columns:
+        moves30 = filtered["30_Move"].dropna()
+        stats.update({
+            "avg_long_30_move": moves30[moves30 > 0].mean(),
+            "avg_short_30_move": moves30[moves30 < 0].mean(),
+        })
+    return stats
+
+
+
+def evaluate_symbols(spec, holders, caches=None, workers=None):
+    """summarize(apply_filters(data, spec)) for every symbol, evaluated concurrently.
+
+    holders maps symbol -> DatasetHolder (loaded on first use) and caches optionally
+    symbol -> StageCache. Threads share the loaded frames; a symbol that fails to load
+    gets its error in the row instead of failing the others.
+    """
+    caches = caches or {}
+
+    def run(symbol):
+        try:
+            data, version = holders[symbol].get()
+            cache = caches.get(symbol)
+            if cache is not None:
+                cache.set_version(version)
+            return {"symbol": symbol, **summarize(apply_filters(data, spec, cache))}
+        except Exception as e:
+            return {"symbol": symbol, "error": str(e)}
+
+    with ThreadPoolExecutor(workers or min(len(holders), os.cpu_count() or 1) or 1) as pool:
+        rows = list(pool.map(run, holders))
+    return pd.DataFrame(rows).set_index("symbol")
+
+PERIODS = {"Month": "M", "Quarter": "Q"}
+
+
+def period_breakdown(filtered, group_by="Year"):
+    # Long/Short counts and shares per Month, Quarter or Year, with the intervals of Long % over all
+    # periods in one batch (see confidence.py); empty when there is nothing to count
+    dates = filtered["Date"]
+    # Undated rows belong to no period (and would turn the years into floats: "2022.0")
+    filtered, dates = filtered[dates.notna()], dates.dropna()
+    if group_by in PERIODS:
+        period = dates.dt.to_period(PERIODS[group_by]).astype(str)
+    else:
+        period = dates.dt.year.astype(str)
+    pivot = filtered["Move.1"].groupby(period.rename("Period")).value_counts().unstack(fill_value=0)
+    if pivot.empty or pivot.sum(axis=1).sum() == 0:
+        return pivot.iloc[:0]
+    pivot["Total"] = pivot.sum(axis=1)
+    pivot["Long %"] = (pivot.get("Long", 0) / pivot["Total"] * 100).round(2)
+    pivot["Short %"] = (pivot.get("Short", 0) / pivot["Total"] * 100).round(2)
+    longs = pivot["Long"] if "Long" in pivot.columns else np.zeros(len(pivot), np.int64)
+    return pivot.join(split_intervals(longs, pivot["Total"], pivot.index))
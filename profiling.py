@@ -0,0 +1,102 @@
+# profiling.py
+"""Per-rerun stage timings for the app, and latency percentiles from the log they leave.
+
+    python profiling.py profile.jsonl
+
+The app enables the profiler when SIGNALS_PROFILE=1 or the page has ?profile=1; each
+rerun then appends one JSON line (stage timings, rows in/out, stage-cache hits) to
+SIGNALS_PROFILE_LOG.
+"""
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+PROFILE_ENV = "SIGNALS_PROFILE"
+PROFILE_LOG = os.environ.get("SIGNALS_PROFILE_LOG", "profile.jsonl")
+
+
+def profiling_enabled(query_params=None):
+    if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+        return True
+    return query_params is not None and query_params.get("profile", "0") not in ("", "0")
+
+
+class Profiler:
+    """Checkpoint timer: mark(stage) closes the running stage and starts the next.
+
+    rows passed to mark() is the row count at that boundary, so it is the rows out of the
+    stage being closed and the rows into the next. Cache hits/misses are deltas of the
+    shared StageCache counters, so concurrent sessions can add to them.
+    """
+
+    def __init__(self, enabled=False, cache=None):
+        self.enabled, self.cache = enabled, cache
+        self.stages = []
+        self._current = None
+        self._started = time.perf_counter()
+
+    def _counters(self):
+        return None if self.cache is None else (self.cache.hits, self.cache.misses)
+
+    def _close(self, rows):
+        if self._current is None:
+            return
+        stage, started, rows_in, before = self._current
+        after = self._counters()
+        hits = misses = None
+        if before is not None and after is not None:
+            hits, misses = after[0] - before[0], after[1] - before[1]
+        self.stages.append({
+            "stage": stage, "ms": round((time.perf_counter() - started) * 1000, 3), "rows_in": rows_in,
+            "rows_out": rows, "cache_hits": hits, "cache_misses": misses,
+        })
+        self._current = None
+
+    def mark(self, stage, rows=None):
+        if not self.enabled:
+            return
+        self._close(rows)
+        self._current = (stage, time.perf_counter(), rows, self._counters())
+
+    def finish(self, rows=None):
+        if self.enabled:
+            self._close(rows)
+
+    def table(self):
+        return pd.DataFrame(self.stages, columns=["stage", "ms", "rows_in", "rows_out", "cache_hits", "cache_misses"])
+
+    def total_ms(self):
+        return round((time.perf_counter() - self._started) * 1000, 3)
+
+    def append_log(self, path=PROFILE_LOG, **extra):
+        record = {"ts": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **extra, "total_ms": self.total_ms(), "stages": self.stages}
+        with open(path, "a") as f:
+            f.write(json.dumps(record, default=str) + "\n")
+
+
+def read_log(path=PROFILE_LOG):
+    # One row per (rerun, stage), plus a "total" stage per rerun
+    rows = []
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            rows.extend({"session": record.get("session"), **s} for s in record["stages"])
+            rows.append({"session": record.get("session"), "stage": "total", "ms": record["total_ms"]})
+    return pd.DataFrame(rows)
+
+
+def percentiles(log, q=(0.5, 0.9, 0.99)):
+    grouped = log.groupby("stage", sort=False)["ms"]
+    out = grouped.quantile(list(q)).unstack()
+    out.columns = [f"p{round(p * 100)}" for p in q]
+    out.insert(0, "runs", grouped.size())
+    return out.round(2)
+
+
+if __name__ == "__main__":
+    print(percentiles(read_log(sys.argv[1] if len(sys.argv) > 1 else PROFILE_LOG)).to_string())
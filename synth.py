@@ -0,0 +1,155 @@
+# synth.py
+"""Synthetic NIFTY data in the analyzer's file schemas, for benchmarks.
+
+    python synth.py --years 10 --out bench_data/10y
+
+Writes the 5-min and 30-min bar files, the daily summary, the prices workbook and a
+small rules workbook under --out, with the file names pipeline.py reads. Bars follow a
+random walk over 09:15-15:30 sessions on business days (a few holidays a year dropped);
+30-min bars, level flags and summary columns are derived from the 5-min bars the same
+way the real files are laid out.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+import features
+from engine import SESSION_OPEN, minute_of_day, session_bucket
+from pipeline import BARS_5_FILE, BARS_30_FILE, PRICES_FILE, RULES_FILE, SUMMARY_FILE, categorize_prev_move
+
+BARS_PER_DAY = 75  # 5-min bars 09:15-15:25
+TZ = "+05:30"
+SIGNALS = [
+    "Gap High", "Gap Low", "Above High", "Below Low", "EMA Strength", "EMA Weakness", "Strength",
+    "Weak", "Mid Strength", "Mid Weak", "Open Strength", "Open Weak", "No Signal",
+]
+
+
+def trading_days(years, start="2005-01-03", holidays_per_year=12, rng=None):
+    rng = rng or np.random.default_rng(0)
+    days = pd.bdate_range(start, periods=int(round(years * 261)))
+    keep = rng.random(len(days)) >= holidays_per_year / 261
+    return days[keep]
+
+
+def simulate_5min(days, rng, start_price=10000.0, bar_vol=0.0011, gap_vol=0.005):
+    n = len(days)
+    rets = rng.normal(0, bar_vol, (n, BARS_PER_DAY))
+    gaps = np.zeros((n, BARS_PER_DAY))
+    gaps[:, 0] = rng.normal(0, gap_vol, n)  # overnight gap lands on the first bar's open
+    close = start_price * np.exp(np.cumsum((gaps + rets).ravel()))
+    open_ = close * np.exp(-rets.ravel())
+    wick = np.abs(rng.normal(0, bar_vol / 2, (2, len(close))))
+    high = np.maximum(open_, close) * (1 + wick[0])
+    low = np.minimum(open_, close) * (1 - wick[1])
+    minutes = SESSION_OPEN + 5 * np.arange(BARS_PER_DAY)
+    times = (days.values[:, None] + (minutes * 60_000_000_000).astype("timedelta64[ns]")).ravel()
+    return pd.DataFrame({
+        "time": pd.DatetimeIndex(times).tz_localize(TZ),
+        "open": open_.round(2), "high": high.round(2), "low": low.round(2), "close": close.round(2),
+    })
+
+
+def resample_30min(df_5):
+    # Session-aligned 30-min buckets from 09:15 (the last one is 15:15-15:25)
+    minute = minute_of_day(df_5["time"])
+    start = df_5["time"].dt.floor("D") + pd.to_timedelta(session_bucket(minute, 30), unit="min")
+    out = df_5.groupby(start.rename("time"), sort=True).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last")
+    )
+    return out.reset_index()
+
+
+def daily_bars(df):
+    day = df["time"].dt.floor("D")
+    return df.groupby(day.rename("day")).agg(
+        open=("open", "first"), high=("high", "max"), low=("low", "min"), close=("close", "last")
+    )
+
+
+def level_flags(df_30):
+    return df_30[features.BAR_COLUMNS].join(features.level_flags(df_30))
+
+
+def candle_shape(o, h, l, c):
+    body, rng_ = np.abs(c - o), (h - l).clip(min=1e-9)
+    upper, lower = h - np.maximum(o, c), np.minimum(o, c) - l
+    color = np.where(c >= o, "Green", "Red")
+    return np.select(
+        [body < 0.1 * rng_, lower >= 2 * body, upper >= 2 * body, body >= 0.6 * rng_],
+        ["Doji", color + " Hammer", color + " Inverted Hammer", "Strong " + color],
+        color,
+    )
+
+
+def daily_summary(df_30, rng):
+    daily = daily_bars(df_30)
+    prev = daily.shift(1)
+    ret = daily["close"] / prev["close"] - 1
+    daily_col = ret.shift(1)  # previous day's return, as in the real summary
+    move = (daily["close"] - daily["open"]).round(2)
+    shape = pd.Series(candle_shape(*(daily[c].to_numpy() for c in ["open", "high", "low", "close"])), index=daily.index)
+    signal = np.select(
+        [daily["open"] > prev["high"], daily["open"] < prev["low"]],
+        ["Gap High", "Gap Low"],
+        rng.choice(SIGNALS[2:], len(daily)),
+    )
+    out = pd.DataFrame({
+        "Date": daily.index.tz_localize(None),
+        "Move": move.to_numpy(),
+        "Move.1": np.where(move > 0, "Long", "Short"),
+        "Signal": signal,
+        "Daily": daily_col.to_numpy(),
+        "Prev_Move": [categorize_prev_move(v * 100) if v == v else None for v in daily_col],
+        "Candles": shape.shift(1).to_numpy(),
+    })
+    return out.iloc[2:].reset_index(drop=True)
+
+
+def prices_sheet(df_30):
+    return df_30[features.BAR_COLUMNS].join(features.price_features(df_30))
+
+
+def rules_sheet():
+    rows = []
+    for signal in SIGNALS:
+        rows.append({"View": "Long", "Signal": signal, "Entry": f"{signal}: wait for confirmation", "Exit": "30-Min Close Below Previous Day's Low"})
+        rows.append({"View": "Short", "Signal": signal, "Entry": f"{signal}: fade the open", "Exit": "30-Min Close Above Previous Day's High"})
+    return pd.DataFrame(rows)
+
+
+def _iso(times):
+    return times.dt.strftime("%Y-%m-%dT%H:%M:%S") + TZ
+
+
+def generate(out, years=1.0, seed=0, start="2005-01-03"):
+    """Write a synthetic data set of about `years` years under out; returns the row counts."""
+    rng = np.random.default_rng(seed)
+    os.makedirs(out, exist_ok=True)
+    df_5 = simulate_5min(trading_days(years, start, rng=rng), rng)
+    df_30 = level_flags(resample_30min(df_5))
+    summary = daily_summary(df_30, rng)
+    prices = prices_sheet(df_30)
+
+    df_5.assign(time=_iso(df_5["time"])).to_csv(os.path.join(out, BARS_5_FILE), index=False)
+    df_30.assign(time=_iso(df_30["time"])).to_csv(os.path.join(out, BARS_30_FILE), index=False)
+    summary.to_excel(os.path.join(out, SUMMARY_FILE), index=False)
+    prices.assign(time=_iso(prices["time"])).to_excel(os.path.join(out, PRICES_FILE), index=False)
+    rules_sheet().to_excel(os.path.join(out, RULES_FILE), index=False)
+    return {"days": len(summary), "bars_5": len(df_5), "bars_30": len(df_30)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--start", default="2005-01-03")
+    parser.add_argument("--out", default="bench_data")
+    args = parser.parse_args(argv)
+    print(generate(args.out, args.years, args.seed, args.start))
+
+
+if __name__ == "__main__":
+    main()
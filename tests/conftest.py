@@ -0,0 +1,37 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datastore  # noqa: E402
+import synth  # noqa: E402
+from pipeline import load_dataset  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synth_root(tmp_path_factory):
+    # Half a year of synthetic data in the source file layout, shared by every test
+    root = str(tmp_path_factory.mktemp("synth"))
+    synth.generate(root, years=0.5, seed=1)
+    return root
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    # A clean Parquet store per test
+    path = str(tmp_path / "cache")
+    monkeypatch.setattr(datastore, "CACHE_DIR", path)
+    return path
+
+
+@pytest.fixture(scope="session")
+def dataset(synth_root, tmp_path_factory):
+    # Loaded once through a store of its own; tests only read it
+    saved, datastore.CACHE_DIR = datastore.CACHE_DIR, str(tmp_path_factory.mktemp("cache"))
+    try:
+        return load_dataset(synth_root)
+    finally:
+        datastore.CACHE_DIR = saved
@@ -0,0 +1,26 @@
+# tests/test_charts.py
+import pandas as pd
+
+from charts import ChartStore, date_key
+
+
+def _prices(days):
+    # Two 30-min bars per day; day i has highs 100 + i, 101 + i and lows 90 + i, 91 + i
+    rows = []
+    for i, day in enumerate(days):
+        for j, minute in enumerate(["09:15", "09:45"]):
+            rows.append({
+                "time": pd.Timestamp(f"{day} {minute}"), "open": 95 + i, "high": 100 + i + j, "low": 90 + i + j,
+                "close": 96 + i, "EMA_100": 95.0,
+            })
+    return pd.DataFrame(rows)
+
+
+def test_previous_levels_skip_weekends_and_holidays():
+    # Thursday, Friday, Monday, Tuesday, then Thursday after a Wednesday holiday
+    days = ["2024-01-04", "2024-01-05", "2024-01-08", "2024-01-09", "2024-01-11"]
+    store = ChartStore(_prices(days))
+    keys = [date_key(pd.Timestamp(day)) for day in days]
+    assert store.previous_levels(keys[0]) is None
+    assert store.previous_levels(keys[2]) == (102.0, 91.0, 96.5)  # Monday: Friday's levels
+    assert store.previous_levels(keys[4]) == (104.0, 93.0, 98.5)  # after the holiday: Tuesday's
@@ -0,0 +1,44 @@
+# tests/test_cube.py
+"""SummaryCube against the row path it stands in for when only summary filters are on."""
+import itertools
+
+import numpy as np
+import pytest
+
+import pandas as pd
+
+from cube import SummaryCube
+from pipeline import MOVE_MAP, filter_summary, period_breakdown, summarize
+
+
+@pytest.fixture(scope="module")
+def cube(dataset):
+    return SummaryCube(dataset.summary)
+
+
+def _combinations(summary):
+    # Every label of each dimension, "Any" and a label the summary does not have
+    signals = ["Any"] + sorted(summary["Signal"].dropna().unique()) + ["Unknown"]
+    candles = ["Any"] + sorted(summary["Candles"].dropna().unique())
+    return list(itertools.product(signals, candles, ["Any"] + list(MOVE_MAP)))
+
+
+def test_summarize_matches_the_rows(dataset, cube):
+    for combo in _combinations(dataset.summary):
+        expected = summarize(filter_summary(dataset.summary, *combo))
+        got = cube.summarize(*combo)
+        assert got.keys() == expected.keys(), combo
+        for name, value in expected.items():
+            assert np.isclose(got[name], value, equal_nan=True), (combo, name)
+
+
+@pytest.mark.parametrize("group_by", ["Month", "Quarter", "Year"])
+def test_breakdown_matches_the_rows(dataset, cube, group_by):
+    for combo in _combinations(dataset.summary):
+        expected = period_breakdown(filter_summary(dataset.summary, *combo), group_by)
+        got = cube.breakdown(*combo, group_by=group_by)
+        if expected.empty:
+            assert got.empty, combo
+            continue
+        expected.columns.name = None
+        pd.testing.assert_frame_equal(got, expected, check_like=True, obj=str(combo))
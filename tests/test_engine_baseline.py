@@ -0,0 +1,144 @@
+# tests/test_engine_baseline.py
+"""The vectorized engines against the original per-day iterrows loops of the app."""
+import pandas as pd
+import pytest
+
+from engine import FIVE_MIN_LOGIC, THIRTY_MIN_LOGIC
+from levels import FLAG_LEVELS, LEVEL_RESULTS, UNTOUCHED_LEVELS
+from pipeline import BARS_5_FILE, BARS_30_FILE, apply_5min, apply_30min, apply_levels, filter_summary
+
+CANDLE_SETS = [None, [2], [5, 3], [2, 4, 13]]
+LEVEL_CANDLE_SETS = [None, [1], [3, 1, 2]]
+
+
+def _key(day):
+    return day.year * 10000 + day.month * 100 + day.day
+
+
+@pytest.fixture(scope="module")
+def raw(synth_root):
+    # The source files as the original app read them: one frame per day, keyed by date
+    days = {}
+    for name, f in [("5", BARS_5_FILE), ("30", BARS_30_FILE)]:
+        df = pd.read_csv(f"{synth_root}/{f}", parse_dates=["time"])
+        df["date"] = df["time"].dt.date
+        days[name] = {day: g for day, g in df.groupby("date", sort=False)}
+    return days
+
+
+def _between(times, start, end):
+    return times.dt.time.between(pd.to_datetime(start).time(), pd.to_datetime(end).time())
+
+
+def baseline_5min(raw, days, logic, beyond_1010):
+    out = {}
+    for day in days:
+        if day not in raw["5"] or day not in raw["30"]:
+            continue
+        df30 = raw["30"][day]
+        h30, l30 = df30.iloc[0]["high"], df30.iloc[0]["low"]
+        df5 = raw["5"][day].sort_values("time").reset_index(drop=True)
+        window = df5[_between(df5["time"], "09:45", "15:30" if beyond_1010 else "10:10")].reset_index(drop=True)
+        candle = None
+        for idx, row in window.iterrows():
+            if logic == "Close Above First 30-min High" and row["close"] > h30:
+                candle, candle_idx = row, idx
+                break
+            elif logic == "Close Below First 30-min Low" and row["close"] < l30:
+                candle, candle_idx = row, idx
+                break
+            elif logic == "No Breakout (Neither)":
+                if (window["close"] <= h30).all() and (window["close"] >= l30).all():
+                    candle, candle_idx = row, idx
+                    break
+        if candle is not None:
+            info = f"#{candle_idx + 1} ({candle['time'].strftime('%H:%M')})"
+            out[_key(day)] = (info, round(df5.iloc[-1]["close"] - candle["close"], 2))
+    return out
+
+
+def baseline_30min(raw, days, logic, candle_nums):
+    out = {}
+    for day in days:
+        if day not in raw["30"]:
+            continue
+        df_day = raw["30"][day].sort_values("time").reset_index(drop=True)
+        high, low = df_day.iloc[0]["high"], df_day.iloc[0]["low"]
+        if candle_nums is None:
+            df_window = df_day[_between(df_day["time"], "09:15", "15:15")].reset_index(drop=True)
+        else:
+            df_window = df_day.iloc[[i - 1 for i in candle_nums if 0 <= i - 1 < len(df_day)]]
+        candle = None
+        for _, row in df_window.iterrows():
+            ch, cl, cc = row["high"], row["low"], row["close"]
+            if logic == "Close Above First 30-min High" and cc > high:
+                candle = row
+                break
+            elif logic == "Close Below First 30-min Low" and cc < low:
+                candle = row
+                break
+            elif logic == "No Breakout (Neither)":
+                if (df_window["close"] <= high).all() and (df_window["close"] >= low).all():
+                    candle = df_window.iloc[0]
+                    break
+            elif logic == "Goes Above Close Below" and ch > high and cc < high:
+                candle = row
+                break
+            elif logic == "Goes Below Close Above" and cl < low and cc > low:
+                candle = row
+                break
+        if candle is not None:
+            index = df_day[df_day["time"] == candle["time"]].index[0] + 1
+            info = f"#{index} ({candle['time'].strftime('%H:%M')})"
+            out[_key(day)] = (info, round(df_day.iloc[-1]["close"] - candle["close"], 2))
+    return out
+
+
+def baseline_levels(raw, days, level, result, candle_nums):
+    out = {}
+    for day in days:
+        df_day = raw["30"].get(day, pd.DataFrame(columns=["time", level])).reset_index(drop=True)
+        if candle_nums is None:
+            df_slice = df_day[_between(df_day["time"], "09:15", "15:15")] if len(df_day) else df_day
+        else:
+            df_slice = df_day.iloc[[i - 1 for i in candle_nums if 0 <= i - 1 < len(df_day)]]
+        for idx, row in df_slice.iterrows():
+            if row[level] == result:
+                out[_key(day)] = f"#{idx + 1} ({row['time'].strftime('%H:%M')})"
+                break
+    return out
+
+
+def _result(filtered, info_col, move_col=None):
+    rows = filtered.set_index("day_key")
+    if move_col is None:
+        return rows[info_col].to_dict() if len(rows) else {}
+    return {k: (rows.at[k, info_col], rows.at[k, move_col]) for k in rows.index}
+
+
+@pytest.mark.parametrize("beyond_1010", [False, True])
+@pytest.mark.parametrize("logic", FIVE_MIN_LOGIC)
+def test_5min_matches_baseline(dataset, raw, logic, beyond_1010):
+    summary = filter_summary(dataset.summary)
+    filtered, _, _ = apply_5min(summary.copy(), dataset, logic, beyond_1010)
+    expected = baseline_5min(raw, summary["Date"].dt.date.unique(), logic, beyond_1010)
+    assert _result(filtered, "5_Candle_Info", "5_Move") == expected
+
+
+@pytest.mark.parametrize("candle_nums", CANDLE_SETS)
+@pytest.mark.parametrize("logic", THIRTY_MIN_LOGIC)
+def test_30min_matches_baseline(dataset, raw, logic, candle_nums):
+    summary = filter_summary(dataset.summary)
+    filtered, _, _ = apply_30min(summary.copy(), dataset, logic, candle_nums)
+    expected = baseline_30min(raw, summary["Date"].dt.date.unique(), logic, candle_nums)
+    assert _result(filtered, "Candle_Info", "30_Move") == expected
+
+
+@pytest.mark.parametrize("candle_nums", LEVEL_CANDLE_SETS)
+@pytest.mark.parametrize("result", LEVEL_RESULTS)
+@pytest.mark.parametrize("level", FLAG_LEVELS + UNTOUCHED_LEVELS)
+def test_levels_match_baseline(dataset, raw, level, result, candle_nums):
+    summary = filter_summary(dataset.summary)
+    filtered = apply_levels(summary.copy(), dataset, "Flag_Candle_Info", [level], result, candle_nums)
+    expected = baseline_levels(raw, summary["Date"].dt.date.unique(), level, result, candle_nums)
+    assert _result(filtered, "Flag_Candle_Info") == expected
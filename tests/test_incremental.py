@@ -0,0 +1,152 @@
+# tests/test_incremental.py
+"""A dataset extended by appends equals a fresh load of the same files."""
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import datastore
+import pipeline
+from pipeline import (
+    BARS_5_FILE, BARS_30_FILE, DEFAULT_SYMBOL, SOURCES, SUMMARY_FILE, DatasetHolder, load_dataset, sync_source,
+)
+
+
+def _lines(path):
+    with open(path, "rb") as f:
+        return f.readlines()
+
+
+def _mid_day_cuts(lines, fractions):
+    # Line numbers near the given fractions of the file that fall inside a day (same date on both sides)
+    cuts = []
+    for frac in fractions:
+        i = max(2, int(len(lines) * frac))
+        while lines[i - 1][:10] != lines[i][:10] or lines[i][11:16] == b"09:15":
+            i += 1
+        cuts.append(i)
+    return cuts
+
+
+def _write(path, content):
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def assert_same_dataset(a, b):
+    assert all(isinstance(a.summary[c].dtype, pd.CategoricalDtype) for c in pipeline.SUMMARY_LABELS)
+    for name in ["summary", "df_30", "df_5"]:
+        pd.testing.assert_frame_equal(getattr(a, name).reset_index(drop=True), getattr(b, name).reset_index(drop=True))
+    for name in ["idx_30", "idx_5"]:
+        for field in ["keys", "starts", "ends"]:
+            np.testing.assert_array_equal(getattr(getattr(a, name), field), getattr(getattr(b, name), field))
+    np.testing.assert_array_equal(a.levels.first, b.levels.first)
+    np.testing.assert_array_equal(a.levels.mask, b.levels.mask)
+
+
+def fresh(root, cache):
+    # Full load of the files through a clean store, leaving the holder's store in place
+    saved, datastore.CACHE_DIR = datastore.CACHE_DIR, cache
+    try:
+        return load_dataset(root)
+    finally:
+        datastore.CACHE_DIR = saved
+
+
+@pytest.fixture
+def grown(synth_root, tmp_path):
+    # A copy of the synthetic files cut twice mid-day: (root, [first part, second part, rest] per source)
+    root = str(tmp_path / "data")
+    shutil.copytree(synth_root, root)
+    chunks = {}
+    for f in [BARS_5_FILE, BARS_30_FILE]:
+        lines = _lines(os.path.join(root, f))
+        a, b = _mid_day_cuts(lines, [0.5, 0.75])
+        chunks[f] = [b"".join(lines[:a]), b"".join(lines[a:b]), b"".join(lines[b:])]
+        _write(os.path.join(root, f), chunks[f][0])
+    summary = pd.read_excel(os.path.join(root, SUMMARY_FILE))
+    a, b = int(len(summary) * 0.5), int(len(summary) * 0.75)
+    chunks[SUMMARY_FILE] = [summary.iloc[:a], summary.iloc[:b], summary]
+    summary.iloc[:a].to_excel(os.path.join(root, SUMMARY_FILE), index=False)
+    return root, chunks
+
+
+def test_appends_equal_a_fresh_load(grown, tmp_path, cache_dir):
+    root, chunks = grown
+    holder = DatasetHolder(root)
+    _, version = holder.get()
+    for step in [1, 2]:
+        for f in [BARS_5_FILE, BARS_30_FILE]:
+            with open(os.path.join(root, f), "ab") as out:
+                out.write(chunks[f][step])
+        chunks[SUMMARY_FILE][step].to_excel(os.path.join(root, SUMMARY_FILE), index=False)
+        data, new_version = holder.get()
+        assert new_version == version + 1
+        version = new_version
+        # Every source took the append path: one stored part per append
+        for name, (f, timeframe, _, _) in SOURCES.items():
+            meta = datastore._read_meta(os.path.join(root, f), (DEFAULT_SYMBOL, timeframe))
+            assert len(meta["parts"]) == step, name
+        assert_same_dataset(data, fresh(root, str(tmp_path / f"fresh{step}")))
+
+
+def test_rewritten_csv_is_rebuilt(grown, tmp_path, cache_dir):
+    root, chunks = grown
+    holder = DatasetHolder(root)
+    holder.get()
+    path = os.path.join(root, BARS_30_FILE)
+    lines = _lines(path)
+    fields = lines[5].split(b",")
+    fields[4] = b"%.2f" % (float(fields[4]) + 1)  # an earlier bar's close changes
+    lines[5] = b",".join(fields)
+    _write(path, b"".join(lines) + chunks[BARS_30_FILE][1])
+    data, version = holder.get()
+    assert version == 2
+    meta = datastore._read_meta(path, (DEFAULT_SYMBOL, SOURCES["df_30"][1]))
+    assert meta["parts"] == [] and meta["rows"] == len(data.df_30)
+    assert sync_source("df_30", root=root)[0] == "unchanged"
+    assert_same_dataset(data, fresh(root, str(tmp_path / "fresh")))
+
+
+def test_summary_is_read_once_per_workbook_version(grown, cache_dir, monkeypatch):
+    root, chunks = grown
+    holder = DatasetHolder(root)
+    reads = []
+    read_summary = pipeline.read_summary
+    monkeypatch.setattr(pipeline, "read_summary", lambda *a: reads.append(a) or read_summary(*a))
+    first = holder.summary()
+    assert holder.summary() is first and len(reads) == 1
+    chunks[SUMMARY_FILE][1].to_excel(os.path.join(root, SUMMARY_FILE), index=False)
+    assert len(holder.summary()) == len(chunks[SUMMARY_FILE][1]) and len(reads) == 2
+
+
+def _with_placeholder(summary, n):
+    # First n days plus the workbook's trailing placeholder: no Date yet, the next day's Daily and Prev_Move
+    placeholder = summary.iloc[n:n + 1].copy()
+    placeholder.loc[:, ~placeholder.columns.isin(["Daily", "Prev_Move"])] = np.nan
+    return pd.concat([summary.iloc[:n], placeholder], ignore_index=True)
+
+
+def test_filled_placeholder_keeps_the_bars(grown, tmp_path, cache_dir, monkeypatch):
+    root, chunks = grown
+    summary = chunks[SUMMARY_FILE][2]
+    sizes = [len(chunks[SUMMARY_FILE][step]) for step in [0, 1]] + [len(summary) - 1]
+    _with_placeholder(summary, sizes[0]).to_excel(os.path.join(root, SUMMARY_FILE), index=False)
+    holder = DatasetHolder(root)
+    holder.get()
+    loads = []
+    monkeypatch.setattr(pipeline, "load_dataset", lambda *a: loads.append(a))
+    for step in [1, 2]:
+        for f in [BARS_5_FILE, BARS_30_FILE]:
+            with open(os.path.join(root, f), "ab") as out:
+                out.write(chunks[f][step])
+        _with_placeholder(summary, sizes[step]).to_excel(os.path.join(root, SUMMARY_FILE), index=False)
+        data, version = holder.get()
+        assert version == step + 1 and not loads
+        # The filled-in placeholder rewrites the summary; the bars still take the append path
+        for name, (f, timeframe, _, _) in SOURCES.items():
+            meta = datastore._read_meta(os.path.join(root, f), (DEFAULT_SYMBOL, timeframe))
+            assert len(meta["parts"]) == (0 if name == "summary" else step), name
+        assert_same_dataset(data, fresh(root, str(tmp_path / f"fresh{step}")))
@@ -0,0 +1,62 @@
+# tests/test_live.py
+"""The live tracker, replayed bar by bar over the 5-min file, against the batch engine."""
+import pandas as pd
+import pytest
+
+from engine import confirm_5min, confirm_30min
+from levels import FLAG_LEVELS, LEVEL_RESULTS
+from live import LiveTracker
+
+
+class DayFeed:
+    # One session of 5-min bars per poll, in the layout _parse returns
+    def __init__(self, df_5):
+        self.days = [day for _, day in df_5.groupby("day_key", sort=True)]
+
+    def poll(self):
+        return self.days.pop(0) if self.days else None
+
+
+def replay(df_5, beyond_1010):
+    # {day_key: (conditions, level table)} as the tracker shows them at each session's close
+    tracker = LiveTracker(DayFeed(df_5), beyond_1010=beyond_1010)
+    out = {}
+    while tracker.poll():
+        key, conditions, levels = tracker.snapshot()
+        out[key] = (conditions, levels)
+    return out
+
+
+def _engine(data, timeframe, logic, beyond_1010):
+    keys = data.idx_5.keys
+    if timeframe == "5-min":
+        matches, _ = confirm_5min(keys, data.df_5, data.idx_5, data.df_30, data.idx_30, logic, beyond_1010)
+    else:
+        matches, _ = confirm_30min(keys, data.df_30, data.idx_30, logic)
+    return {key: (row.candle, row.time, row.move) for key, row in matches.iterrows()}
+
+
+@pytest.mark.parametrize("beyond_1010", [False, True])
+def test_replay_matches_the_engine(dataset, beyond_1010):
+    days = replay(dataset.df_5, beyond_1010)
+    assert len(days) == len(dataset.idx_5.keys)
+    rows = pd.concat([conditions.assign(day_key=key) for key, (conditions, _) in days.items()])
+    for (timeframe, logic), group in rows.groupby(["timeframe", "condition"], sort=False):
+        matched = group[group["status"] == "matched"]
+        live = {key: tuple(rest) for key, *rest in matched[["day_key", "candle", "time", "move"]].itertuples(index=False)}
+        assert live == _engine(dataset, timeframe, logic, beyond_1010), (timeframe, logic)
+
+
+def test_replay_level_candles_match_level_events(dataset):
+    days = replay(dataset.df_5, False)
+    # The first session has no previous levels, live or in the bar file
+    keys = [key for key, (_, levels) in days.items() if len(levels)]
+    assert len(keys) == len(days) - 1
+    for level in FLAG_LEVELS:
+        for result in LEVEL_RESULTS:
+            live = {}
+            for key in keys:
+                table = days[key][1].set_index("level")
+                if pd.notna(table.at[level, result]):
+                    live[key] = table.at[level, result]
+            assert live == dataset.levels.match(keys, [level], result)["candle_info"].to_dict(), (level, result)
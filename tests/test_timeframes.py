@@ -0,0 +1,52 @@
+# tests/test_timeframes.py
+import numpy as np
+import pandas as pd
+
+from engine import FIVE_MIN_LOGIC, THIRTY_MIN_LOGIC, DayIndex, confirm_30min, hhmm, window_end_5
+from pipeline import FilterSpec, apply_5min, apply_filters, filter_summary, resample_bars
+
+
+def test_resample_30_matches_the_30min_file(dataset):
+    bars = resample_bars(dataset.df_5, 30)
+    stored = dataset.df_30
+    assert len(bars) == len(stored)
+    for col in ["open", "high", "low", "close", "day_key", "minute"]:
+        np.testing.assert_array_equal(bars[col].to_numpy(), stored[col].to_numpy())
+    assert (bars["time"].to_numpy() == stored["time"].to_numpy()).all()
+
+
+def test_conditions_on_resampled_30_match_the_file(dataset):
+    keys = dataset.summary["day_key"].unique()
+    stored = dataset.timeframes.get(30)
+    fresh = resample_bars(dataset.df_5, 30)
+    for logic in THIRTY_MIN_LOGIC:
+        a, _ = confirm_30min(keys, fresh, DayIndex(fresh["day_key"]), logic)
+        b, _ = confirm_30min(keys, *stored, logic)
+        pd.testing.assert_frame_equal(a, b)
+
+
+def test_timeframes_are_built_once(dataset):
+    assert dataset.timeframes.get(15) is dataset.timeframes.get(15)
+    bars, idx = dataset.timeframes.get(60)
+    assert set(bars["minute"]) <= {555, 615, 675, 735, 795, 855, 915}
+    assert len(idx) == len(dataset.idx_5)
+
+
+def test_window_follows_the_range():
+    assert hhmm(window_end_5(30)) == "10:10"
+    assert hhmm(window_end_5(60)) == "10:40"
+    assert hhmm(window_end_5(60, beyond_1010=True)) == "15:30"
+
+
+def test_sixty_minute_range_can_match(dataset):
+    summary = filter_summary(dataset.summary)
+    for logic in FIVE_MIN_LOGIC:
+        filtered, matches, _ = apply_5min(summary.copy(), dataset, logic, range_minutes=60)
+        assert len(matches) > 0, logic
+        assert matches["time"].between("10:15", "10:40").all()
+
+
+def test_spec_timeframes(dataset):
+    spec = FilterSpec(logic_30=THIRTY_MIN_LOGIC[0], timeframe_30=15)
+    assert len(apply_filters(dataset, spec)) > 0
+    assert FilterSpec(range_5=60, timeframe_30=15).summary_only()